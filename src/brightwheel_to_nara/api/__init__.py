@@ -1,5 +1,6 @@
 """API clients for Brightwheel and Nara."""
 from .brightwheel_client import BrightwheelClient
 from .nara_client import NaraClient
+from .pool import get_http_client, close_http_clients
 
-__all__ = ["BrightwheelClient", "NaraClient"]
\ No newline at end of file
+__all__ = ["BrightwheelClient", "NaraClient", "get_http_client", "close_http_clients"]
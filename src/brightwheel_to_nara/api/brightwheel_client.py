@@ -1,18 +1,110 @@
 """Brightwheel API client implementation."""
+from __future__ import annotations
+
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import hashlib
+import itertools
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator, Deque, Optional, List, Dict, Mapping, Set, Tuple
 import httpx
-from playwright.async_api import async_playwright, Page
-import json
+import orjson
 
+from .pool import JSON_HEADERS, get_http_client
+from ..utils.errors import retry_transient_errors
+from ..config import CACHE_DIR
 from ..models.brightwheel import (
-    LoginRequest, LoginResponse, Session,
-    Student, GetStudentsResponse, 
-    Feed, GetFeedRequest,
-    ActivityType
+    Session, GetStudentsResponse, Feed
 )
 
+if TYPE_CHECKING:
+    from ..models.brightwheel import Student, ActivityType, ActivityData
+
+
+logger = logging.getLogger(__name__)
+
+# The sign-in page embeds the CSRF token that the login request must echo back
+CSRF_TOKEN_PATTERN = re.compile(r'<meta name="csrf-token" content="([^"]+)"')
+
+# Responses Brightwheel returns when it wants a captcha solved before login
+CAPTCHA_STATUS_CODES = frozenset({403, 422, 429})
+
+# How long a Brightwheel session is trusted before logging in again
+SESSION_LIFETIME = timedelta(hours=24)
+
+# A cookie verified against /me within this many seconds is trusted without a new check
+SESSION_CACHE_FILE = CACHE_DIR / "session.json"
+SESSION_VERIFY_TTL_SECONDS = 300
+
+# Browser profile reused by the Playwright login so cookies survive between runs
+BROWSER_PROFILE_DIR = CACHE_DIR / "pw-profile"
+
+# Longest date range fetched in one activities request; the default sync is a single request
+ACTIVITY_WINDOW_DAYS = 28
+
+# Activity requests in flight for one student when a range spans several windows
+MAX_CONCURRENT_WINDOWS = 2
+
+
+def _hash_cookie(session_cookie: str) -> str:
+    """Hash a session cookie so the cookie itself is never written to disk."""
+    return hashlib.blake2b(session_cookie.encode(), digest_size=16).hexdigest()
+
+
+def _load_verified_user_id(cookie_hash: str) -> Optional[str]:
+    """
+    Look up a recent successful cookie verification.
+    
+    Args:
+        cookie_hash: Hash of the session cookie
+        
+    Returns:
+        User ID if the cookie was verified recently, None otherwise
+    """
+    try:
+        cached = orjson.loads(SESSION_CACHE_FILE.read_bytes())
+    except (OSError, ValueError):
+        return None
+        
+    if (cached.get('cookie_hash') == cookie_hash and
+            time.time() - cached.get('verified_at', 0) < SESSION_VERIFY_TTL_SECONDS):
+        return cached.get('user_id', '')
+    return None
+
+
+def _save_verified_user_id(cookie_hash: str, user_id: str):
+    """
+    Remember a successful cookie verification.
+    
+    Args:
+        cookie_hash: Hash of the session cookie
+        user_id: ID of the user the cookie belongs to
+    """
+    try:
+        SESSION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        SESSION_CACHE_FILE.write_bytes(orjson.dumps({
+            'cookie_hash': cookie_hash,
+            'verified_at': time.time(),
+            'user_id': user_id
+        }))
+    except OSError as e:
+        logger.debug(f"Could not write session cache: {e}")
+
+
+@lru_cache(maxsize=1024)
+def _iso_day(day: date) -> str:
+    """Format a query date, cached since every student syncs the same days."""
+    return day.isoformat()
+
+
+def _cookie_header(cookies: Mapping[str, str]) -> str:
+    """Format cookies as a Cookie request header."""
+    return "; ".join(f"{name}={value}" for name, value in cookies.items())
+
 
 class BrightwheelClient:
     """Client for interacting with Brightwheel API."""
@@ -20,24 +112,37 @@ class BrightwheelClient:
     BASE_URL = "https://schools.mybrightwheel.com"
     API_BASE = f"{BASE_URL}/api/v1"
     
-    def __init__(self):
-        """Initialize the Brightwheel client."""
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
+        """
+        Initialize the Brightwheel client.
+        
+        Args:
+            http_client: HTTP client to use instead of the shared connection pool
+            max_retries: Retries for requests failing with a transient error
+            retry_delay: Initial delay in seconds between retries
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
         self.session: Optional[Session] = None
-        self.http_client: Optional[httpx.AsyncClient] = None
+        self._session_expires_ts = 0.0
+        # Sent with every request, since the pooled HTTP client is shared with other instances
+        self._auth_headers: Dict[str, str] = {}
+        self.http_client: Optional[httpx.AsyncClient] = http_client
         
     async def __aenter__(self):
         """Async context manager entry."""
-        self.http_client = httpx.AsyncClient(
-            base_url=self.BASE_URL,
-            timeout=30.0,
-            follow_redirects=True
-        )
+        if self.http_client is None:
+            self.http_client = get_http_client(self.BASE_URL, "brightwheel")
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.http_client:
-            await self.http_client.aclose()
+        """Async context manager exit. The shared pool stays open for reuse."""
+        pass
             
     async def login_with_cookie(self, session_cookie: str) -> Session:
         """
@@ -49,22 +154,32 @@ class BrightwheelClient:
         Returns:
             Session object with auth tokens
         """
-        # Set the cookie in the HTTP client
-        self.http_client.cookies.set('_brightwheel_v2', session_cookie, domain='.mybrightwheel.com')
+        # Skip the verification request if this cookie was checked moments ago
+        cookie_hash = _hash_cookie(session_cookie)
+        user_id = _load_verified_user_id(cookie_hash)
+        if user_id is not None:
+            return self._start_session(
+                token=session_cookie,
+                cookies={'_brightwheel_v2': session_cookie},
+                user_id=user_id
+            )
         
         # Verify the session is valid by making a test request
         try:
-            response = await self.http_client.get(f"{self.API_BASE}/me")
+            response = await self.http_client.get(
+                f"{self.API_BASE}/me",
+                headers={"Cookie": _cookie_header({'_brightwheel_v2': session_cookie})}
+            )
             response.raise_for_status()
             
-            user_data = response.json()
+            user_data = orjson.loads(response.content)
             user_id = user_data.get('id', '')
+            _save_verified_user_id(cookie_hash, user_id)
             
             # Create session object
-            self.session = Session(
+            self._start_session(
                 token=session_cookie,
                 cookies={'_brightwheel_v2': session_cookie},
-                expires_at=datetime.utcnow() + timedelta(hours=24),
                 user_id=user_id
             )
             
@@ -76,6 +191,89 @@ class BrightwheelClient:
             raise
     
     async def login(self, username: str, password: str) -> Session:
+        """
+        Login to Brightwheel.
+        
+        Replays the browser sign-in request over plain HTTP first and launches
+        Playwright when that doesn't produce a session: a captcha, rejected
+        credentials or any other unexpected response. Only the browser login
+        decides whether the credentials are wrong.
+        
+        Args:
+            username: Email or phone number
+            password: User password
+            
+        Returns:
+            Session object with auth tokens
+        """
+        try:
+            session = await self._login_with_http(username, password)
+        except httpx.TransportError as e:
+            logger.warning(f"HTTP login failed: {e}")
+            session = None
+            
+        if session:
+            return session
+            
+        logger.info("Falling back to browser login...")
+        return await self._login_with_browser(username, password)
+    
+    async def _login_with_http(self, username: str, password: str) -> Optional[Session]:
+        """
+        Login to Brightwheel without a browser.
+        
+        Args:
+            username: Email or phone number
+            password: User password
+            
+        Returns:
+            Session object, or None if the browser login has to be used
+        """
+        sign_in_page = await self.http_client.get("/sign-in")
+        match = CSRF_TOKEN_PATTERN.search(sign_in_page.text)
+        # The shared HTTP client keeps no cookies, so return the sign-in page's own
+        headers = {"Cookie": _cookie_header(sign_in_page.cookies)} if sign_in_page.cookies else {}
+        if match:
+            headers["X-CSRF-Token"] = match.group(1)
+        
+        response = await self.http_client.post(
+            f"{self.API_BASE}/sessions",
+            content=orjson.dumps({"user": {"email": username, "password": password}}),
+            headers={**JSON_HEADERS, **headers}
+        )
+        
+        if response.status_code in CAPTCHA_STATUS_CODES or "captcha" in response.text.lower():
+            logger.info(f"HTTP login needs a captcha (status {response.status_code})")
+            return None
+        # The sign-in endpoint isn't documented, so any other failure just means
+        # this shortcut doesn't work; the browser login reports bad credentials
+        if not response.is_success:
+            logger.info(f"HTTP login not accepted (status {response.status_code})")
+            return None
+            
+        session_cookie = response.cookies.get('_brightwheel_v2')
+        if not session_cookie:
+            logger.info(f"HTTP login returned no session cookie (status {response.status_code})")
+            return None
+            
+        try:
+            user_data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            logger.info(f"HTTP login returned no JSON (status {response.status_code})")
+            return None
+        if not isinstance(user_data, dict):
+            logger.info(f"HTTP login returned unexpected JSON (status {response.status_code})")
+            return None
+        
+        self._start_session(
+            token=session_cookie,
+            cookies={'_brightwheel_v2': session_cookie},
+            user_id=user_data.get('id', '')
+        )
+        
+        return self.session
+    
+    async def _login_with_browser(self, username: str, password: str) -> Session:
         """
         Login to Brightwheel using Playwright to handle captcha.
         
@@ -86,35 +284,51 @@ class BrightwheelClient:
         Returns:
             Session object with auth tokens
         """
+        # Playwright is slow to import and only needed when a captcha must be solved
+        from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+        
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)  # Show browser for captcha
-            context = await browser.new_context()
-            page = await context.new_page()
+            # A persistent profile keeps the browser session between runs
+            BROWSER_PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir=str(BROWSER_PROFILE_DIR),
+                headless=False  # Show browser for captcha
+            )
+            page = context.pages[0] if context.pages else await context.new_page()
             
             try:
                 # Navigate to login page
                 await page.goto(f"{self.BASE_URL}/sign-in")
                 
-                # Fill in credentials
-                await page.fill('input[data-testid="username-input"]', username)
-                await page.fill('input[data-testid="password-input"]', password)
-                
-                # Click sign in
-                await page.click('button[data-testid="sign-in-button"]')
-                
-                # Wait for either successful login or captcha
-                # Give user time to solve captcha if needed
-                print("Please solve the captcha if prompted...")
-                
-                # Wait for navigation after login
-                try:
-                    await page.wait_for_url("**/feed", timeout=60000)  # 60 second timeout
-                except:
-                    # May redirect to different page based on user type
-                    await page.wait_for_function(
-                        "window.location.pathname !== '/sign-in'",
-                        timeout=60000
-                    )
+                # A session still valid from an earlier run redirects away from sign-in
+                if "/sign-in" in page.url:
+                    # Fill in credentials
+                    await page.fill('input[data-testid="username-input"]', username)
+                    await page.fill('input[data-testid="password-input"]', password)
+                    
+                    # Click sign in
+                    await page.click('button[data-testid="sign-in-button"]')
+                    
+                    # Wait for either successful login or captcha
+                    # Give user time to solve captcha if needed
+                    print("Please solve the captcha if prompted...")
+                    
+                    # Wait for navigation after login
+                    try:
+                        await page.wait_for_url("**/feed", timeout=60000)  # 60 second timeout
+                    except:
+                        # May redirect to different page based on user type
+                        try:
+                            await page.wait_for_function(
+                                "window.location.pathname !== '/sign-in'",
+                                timeout=60000
+                            )
+                        except PlaywrightTimeoutError:
+                            pass
+                            
+                    # Still on the sign-in page: Brightwheel rejected the credentials
+                    if "/sign-in" in page.url:
+                        raise ValueError("Invalid Brightwheel username or password.")
                 
                 # Extract cookies and session info
                 cookies = await context.cookies()
@@ -135,31 +349,52 @@ class BrightwheelClient:
                     session_token = cookie_dict.get('_brightwheel_v2', '')
                 
                 # Create session object
-                self.session = Session(
+                self._start_session(
                     token=session_token,
                     cookies=cookie_dict,
-                    expires_at=datetime.utcnow() + timedelta(hours=24),
                     user_id=""  # Will be populated from API call
                 )
                 
-                # Update HTTP client with cookies
-                if self.http_client:
-                    self.http_client.cookies.update(cookie_dict)
-                    if session_token:
-                        self.http_client.headers['Authorization'] = f"Bearer {session_token}"
+                if session_token:
+                    self._auth_headers['Authorization'] = f"Bearer {session_token}"
                 
                 return self.session
                 
             finally:
-                await browser.close()
+                await context.close()
+    
+    def _start_session(self, token: str, cookies: Dict[str, str], user_id: str) -> Session:
+        """
+        Record a newly authenticated session.
+        
+        Args:
+            token: Session token
+            cookies: Session cookies
+            user_id: ID of the logged in user
+            
+        Returns:
+            Session object
+        """
+        expires_at = datetime.now(timezone.utc) + SESSION_LIFETIME
+        self.session = Session(
+            token=token,
+            cookies=cookies,
+            expires_at=expires_at,
+            user_id=user_id
+        )
+        # Cached as a float so the check before every request is a plain comparison
+        self._session_expires_ts = expires_at.timestamp()
+        self._auth_headers = {"Cookie": _cookie_header(cookies)} if cookies else {}
+        return self.session
     
     def _check_session(self):
         """Check if session is valid."""
         if not self.session:
             raise ValueError("Not authenticated. Please login first.")
-        if self.session.expires_at < datetime.utcnow():
+        if time.time() >= self._session_expires_ts:
             raise ValueError("Session expired. Please login again.")
     
+    @retry_transient_errors
     async def get_students(self) -> List[Student]:
         """
         Get list of students/children.
@@ -171,31 +406,15 @@ class BrightwheelClient:
         
         response = await self.http_client.get(
             f"{self.API_BASE}/students",
-            params={"include": "guardians,room"}
+            params={"include": "guardians,room"},
+            headers=self._auth_headers
         )
         response.raise_for_status()
         
-        data = response.json()
-        students = []
-        
-        for student_data in data.get('students', []):
-            student = Student(
-                id=student_data['id'],
-                first_name=student_data['first_name'],
-                last_name=student_data['last_name'],
-                birthdate=datetime.fromisoformat(student_data['birthdate']),
-                room_id=student_data.get('room_id'),
-                room_name=student_data.get('room', {}).get('name'),
-                guardian_ids=[g['id'] for g in student_data.get('guardians', [])],
-                profile_photo_url=student_data.get('profile_photo_url'),
-                allergies=student_data.get('allergies', []),
-                medical_notes=student_data.get('medical_notes'),
-                enrollment_status=student_data.get('enrollment_status', 'active')
-            )
-            students.append(student)
-            
-        return students
+        # Parse straight from bytes so pydantic-core builds the models in one pass
+        return GetStudentsResponse.model_validate_json(response.content).students
     
+    @retry_transient_errors
     async def get_student_feed(
         self, 
         student_id: str,
@@ -233,25 +452,22 @@ class BrightwheelClient:
             
         response = await self.http_client.get(
             f"{self.API_BASE}/feed",
-            params=params
+            params=params,
+            headers=self._auth_headers
         )
         response.raise_for_status()
         
-        data = response.json()
-        
-        return Feed(
-            items=[],  # Would parse individual items here
-            has_more=data.get('has_more', False),
-            next_cursor=data.get('next_cursor')
-        )
+        # Each item's activity is dispatched to its model by the activity_type tag
+        return Feed.model_validate_json(response.content)
     
+    @retry_transient_errors
     async def get_activities(
         self,
         student_id: str,
         start_date: datetime,
         end_date: datetime,
         activity_type: Optional[ActivityType] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[ActivityData]:
         """
         Get activities for a student within a date range.
         
@@ -268,8 +484,8 @@ class BrightwheelClient:
         
         params = {
             "student_id": student_id,
-            "start_date": start_date.date().isoformat(),
-            "end_date": end_date.date().isoformat()
+            "start_date": _iso_day(start_date.date()),
+            "end_date": _iso_day(end_date.date())
         }
         
         if activity_type:
@@ -277,8 +493,90 @@ class BrightwheelClient:
             
         response = await self.http_client.get(
             f"{self.API_BASE}/activities",
-            params=params
+            params=params,
+            headers=self._auth_headers
         )
         response.raise_for_status()
         
-        return response.json().get('activities', [])
\ No newline at end of file
+        # The transformers read plain dicts, so decode with orjson rather than building models
+        return orjson.loads(response.content).get('activities', [])
+    
+    @staticmethod
+    def _date_windows(
+        start_date: datetime,
+        end_date: datetime,
+        window_days: int
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Split a date range into windows of at most window_days days.
+        
+        The API doesn't document whether end_date is inclusive, so each window
+        ends on the day the next one starts rather than the day before;
+        iter_activity_windows drops the activities returned twice for that day.
+        """
+        windows = []
+        window_start = start_date
+        while True:
+            window_end = min(window_start + timedelta(days=window_days), end_date)
+            windows.append((window_start, window_end))
+            if window_end >= end_date:
+                return windows
+            window_start = window_end
+        
+    async def iter_activity_windows(
+        self,
+        student_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        activity_type: Optional[ActivityType] = None,
+        window_days: int = ACTIVITY_WINDOW_DAYS
+    ) -> AsyncIterator[List[ActivityData]]:
+        """
+        Yield activities one date window at a time, oldest first.
+        
+        A range up to window_days long is a single request, as it always was.
+        Longer ranges are split so no single response grows unbounded, with up
+        to MAX_CONCURRENT_WINDOWS requests in flight.
+        
+        Args:
+            student_id: ID of the student
+            start_date: Start date
+            end_date: End date
+            activity_type: Optional filter by type
+            window_days: Most days covered by each request
+            
+        Yields:
+            List of activity dictionaries for each window
+        """
+        windows = iter(self._date_windows(start_date, end_date, window_days))
+        pending: Deque[asyncio.Task] = deque()
+        seen_ids: Set[str] = set()
+        
+        def prefetch():
+            for window_start, window_end in itertools.islice(
+                windows, MAX_CONCURRENT_WINDOWS - len(pending)
+            ):
+                pending.append(asyncio.create_task(self.get_activities(
+                    student_id, window_start, window_end, activity_type
+                )))
+                
+        try:
+            prefetch()
+            while pending:
+                activities = await pending.popleft()
+                prefetch()
+                # Adjacent windows share their boundary day
+                fresh = []
+                for activity in activities:
+                    activity_id = activity.get('id')
+                    if activity_id is not None:
+                        if activity_id in seen_ids:
+                            continue
+                        seen_ids.add(activity_id)
+                    fresh.append(activity)
+                yield fresh
+        finally:
+            for task in pending:
+                task.cancel()
+            # Collect the cancelled windows so none is left running or with an unread exception
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -1,44 +1,68 @@
 """Nara Baby Tracker API client implementation."""
+from __future__ import annotations
+
+import asyncio
+import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Sequence, Union
 import httpx
+import orjson
 
+from .pool import JSON_HEADERS, ORJSON_OPTIONS, get_http_client
+from ..utils.errors import NaraError, retry_transient_errors, retry_unsent_requests
 from ..models.nara import (
     NaraLoginRequest, NaraLoginResponse,
-    Baby, NaraActivityType,
-    CreateActivityRequest, CreateActivityResponse,
-    GetActivitiesRequest, GetActivitiesResponse,
-    DiaperRecord, FeedingRecord, SleepRecord,
-    HealthRecord, MeasurementRecord, PhotoRecord,
-    MilestoneRecord, PumpingRecord, TummyTimeRecord,
-    PlayRecord
+    GetBabiesResponse, NaraBaseActivity,
+    CreateActivityResponse, BatchCreateActivitiesResponse, GetActivitiesResponse,
+    DiaperRecord, FeedingRecord, SleepRecord
 )
 
+if TYPE_CHECKING:
+    from ..models.nara import Baby, NaraActivityType
+
+
+logger = logging.getLogger(__name__)
+
+# Statuses meaning the batch endpoint doesn't exist on this Nara deployment
+BATCH_UNSUPPORTED_STATUS_CODES = frozenset({404, 405, 501})
+
 
 class NaraClient:
     """Client for interacting with Nara Baby Tracker API."""
     
     BASE_URL = "https://api.nara.com"  # This would be the actual API URL
     
-    def __init__(self):
-        """Initialize the Nara client."""
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
+        """
+        Initialize the Nara client.
+        
+        Args:
+            http_client: HTTP client to use instead of the shared connection pool
+            max_retries: Retries for requests failing with a transient error
+            retry_delay: Initial delay in seconds between retries
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
         self.access_token: Optional[str] = None
         self.refresh_token: Optional[str] = None
-        self.http_client: Optional[httpx.AsyncClient] = None
+        self.http_client: Optional[httpx.AsyncClient] = http_client
+        self._batch_create_supported = True
         
     async def __aenter__(self):
         """Async context manager entry."""
-        self.http_client = httpx.AsyncClient(
-            base_url=self.BASE_URL,
-            timeout=30.0,
-            follow_redirects=True
-        )
+        if self.http_client is None:
+            self.http_client = get_http_client(self.BASE_URL, "nara")
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.http_client:
-            await self.http_client.aclose()
+        """Async context manager exit. The shared pool stays open for reuse."""
+        pass
             
     async def login(self, email: str, password: str) -> NaraLoginResponse:
         """
@@ -55,26 +79,30 @@ class NaraClient:
         
         response = await self.http_client.post(
             "/auth/login",
-            json=request.model_dump()
+            content=request.model_dump_json(),
+            headers=JSON_HEADERS
         )
         response.raise_for_status()
         
-        login_response = NaraLoginResponse(**response.json())
+        login_response = NaraLoginResponse.model_validate_json(response.content)
         
         # Store tokens
         self.access_token = login_response.access_token
         self.refresh_token = login_response.refresh_token
         
-        # Update headers
-        self.http_client.headers['Authorization'] = f"Bearer {self.access_token}"
-        
         return login_response
     
+    @property
+    def _auth_headers(self) -> Dict[str, str]:
+        """Authorization header sent with each request, since the pooled HTTP client is shared."""
+        return {'Authorization': f"Bearer {self.access_token}"} if self.access_token else {}
+    
     def _check_auth(self):
         """Check if authenticated."""
         if not self.access_token:
             raise ValueError("Not authenticated. Please login first.")
     
+    @retry_transient_errors
     async def get_babies(self) -> List[Baby]:
         """
         Get list of babies/children.
@@ -84,12 +112,12 @@ class NaraClient:
         """
         self._check_auth()
         
-        response = await self.http_client.get("/babies")
+        response = await self.http_client.get("/babies", headers=self._auth_headers)
         response.raise_for_status()
         
-        data = response.json()
-        return [Baby(**baby_data) for baby_data in data.get('babies', [])]
+        return GetBabiesResponse.model_validate_json(response.content).babies
     
+    @retry_transient_errors
     async def create_diaper_activity(
         self,
         baby_id: str,
@@ -107,16 +135,18 @@ class NaraClient:
         """
         self._check_auth()
         
-        diaper_record.baby_id = baby_id
+        diaper_record = diaper_record.model_copy(update={'baby_id': baby_id})
         
         response = await self.http_client.post(
             f"/babies/{baby_id}/activities/diaper",
-            json=diaper_record.model_dump()
+            content=diaper_record.model_dump_json(),
+            headers={**JSON_HEADERS, **self._auth_headers}
         )
         response.raise_for_status()
         
-        return CreateActivityResponse(**response.json())
+        return CreateActivityResponse.model_validate_json(response.content)
     
+    @retry_transient_errors
     async def create_feeding_activity(
         self,
         baby_id: str,
@@ -134,16 +164,18 @@ class NaraClient:
         """
         self._check_auth()
         
-        feeding_record.baby_id = baby_id
+        feeding_record = feeding_record.model_copy(update={'baby_id': baby_id})
         
         response = await self.http_client.post(
             f"/babies/{baby_id}/activities/feeding",
-            json=feeding_record.model_dump()
+            content=feeding_record.model_dump_json(),
+            headers={**JSON_HEADERS, **self._auth_headers}
         )
         response.raise_for_status()
         
-        return CreateActivityResponse(**response.json())
+        return CreateActivityResponse.model_validate_json(response.content)
     
+    @retry_transient_errors
     async def create_sleep_activity(
         self,
         baby_id: str,
@@ -161,16 +193,18 @@ class NaraClient:
         """
         self._check_auth()
         
-        sleep_record.baby_id = baby_id
+        sleep_record = sleep_record.model_copy(update={'baby_id': baby_id})
         
         response = await self.http_client.post(
             f"/babies/{baby_id}/activities/sleep",
-            json=sleep_record.model_dump()
+            content=sleep_record.model_dump_json(),
+            headers={**JSON_HEADERS, **self._auth_headers}
         )
         response.raise_for_status()
         
-        return CreateActivityResponse(**response.json())
+        return CreateActivityResponse.model_validate_json(response.content)
     
+    @retry_transient_errors
     async def create_generic_activity(
         self,
         baby_id: str,
@@ -192,12 +226,141 @@ class NaraClient:
         
         response = await self.http_client.post(
             f"/babies/{baby_id}/activities",
-            json=activity
+            content=orjson.dumps(activity, option=ORJSON_OPTIONS),
+            headers={**JSON_HEADERS, **self._auth_headers}
+        )
+        response.raise_for_status()
+        
+        return CreateActivityResponse.model_validate_json(response.content)
+    
+    async def create_activity(
+        self,
+        baby_id: str,
+        record: Union[NaraBaseActivity, Dict[str, Any]]
+    ) -> CreateActivityResponse:
+        """
+        Create an activity using the endpoint matching its record type.
+        
+        Args:
+            baby_id: ID of the baby
+            record: Activity record, or activity data as dictionary
+            
+        Returns:
+            Response with created activity
+        """
+        if isinstance(record, DiaperRecord):
+            return await self.create_diaper_activity(baby_id, record)
+        if isinstance(record, FeedingRecord):
+            return await self.create_feeding_activity(baby_id, record)
+        if isinstance(record, SleepRecord):
+            return await self.create_sleep_activity(baby_id, record)
+        if isinstance(record, NaraBaseActivity):
+            return await self.create_generic_activity(baby_id, record.model_dump())
+        return await self.create_generic_activity(baby_id, record)
+    
+    async def create_activities_bulk(
+        self,
+        baby_id: str,
+        records: Sequence[Union[NaraBaseActivity, Dict[str, Any]]],
+        concurrency: int = 10
+    ) -> List[Union[CreateActivityResponse, BaseException]]:
+        """
+        Create many activities concurrently.
+        
+        Args:
+            baby_id: ID of the baby
+            records: Activity records to create
+            concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            Response or raised exception for each record, in input order
+        """
+        self._check_auth()
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def create_one(record):
+            async with semaphore:
+                return await self.create_activity(baby_id, record)
+                
+        return await asyncio.gather(
+            *(create_one(record) for record in records),
+            return_exceptions=True
+        )
+    
+    # A batch Nara received may already be stored, so only retry requests that never got there
+    @retry_unsent_requests
+    async def _post_activities_batch(
+        self,
+        baby_id: str,
+        activities: List[Dict[str, Any]]
+    ) -> List[Union[CreateActivityResponse, NaraError]]:
+        """
+        Create several activities with a single batch request.
+        
+        Args:
+            baby_id: ID of the baby
+            activities: Activity data with baby_id set
+            
+        Returns:
+            Response, or error if Nara rejected it, for each activity in input order
+            
+        Raises:
+            NaraError: If the response doesn't have one result per activity
+        """
+        response = await self.http_client.post(
+            f"/babies/{baby_id}/activities:batchCreate",
+            content=orjson.dumps({'activities': activities}, option=ORJSON_OPTIONS),
+            headers={**JSON_HEADERS, **self._auth_headers}
         )
         response.raise_for_status()
         
-        return CreateActivityResponse(**response.json())
+        results = BatchCreateActivitiesResponse.model_validate_json(response.content).activities
+        # Without one result per activity there's no telling which were stored
+        if len(results) != len(activities):
+            raise NaraError(
+                f"Batch create returned {len(results)} results for {len(activities)} activities"
+            )
+        return [
+            result if result.success else NaraError(f"Nara rejected {result.activity.get('activity_type')} activity")
+            for result in results
+        ]
     
+    async def create_generic_activities_batch(
+        self,
+        baby_id: str,
+        activities: List[Dict[str, Any]]
+    ) -> List[Union[CreateActivityResponse, BaseException]]:
+        """
+        Create several generic activities, in one request when Nara supports it.
+        
+        If the batch endpoint is missing, the client remembers that and creates
+        activities one request at a time over the shared HTTP/2 connection.
+        
+        Args:
+            baby_id: ID of the baby
+            activities: Activity data
+            
+        Returns:
+            Response or raised exception for each activity, in input order
+        """
+        self._check_auth()
+        
+        for activity in activities:
+            activity['baby_id'] = baby_id
+            
+        if self._batch_create_supported:
+            try:
+                return await self._post_activities_batch(baby_id, activities)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in BATCH_UNSUPPORTED_STATUS_CODES:
+                    raise
+                logger.info("Nara batch endpoint unavailable, creating activities individually")
+                self._batch_create_supported = False
+                
+        return await self.create_activities_bulk(baby_id, activities)
+    
+    @retry_transient_errors
     async def get_activities(
         self,
         baby_id: str,
@@ -237,11 +400,12 @@ class NaraClient:
             
         response = await self.http_client.get(
             f"/babies/{baby_id}/activities",
-            params=params
+            params=params,
+            headers=self._auth_headers
         )
         response.raise_for_status()
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         return GetActivitiesResponse(
             activities=data.get('activities', []),
@@ -268,17 +432,21 @@ class NaraClient:
         """
         self._check_auth()
         
-        with open(photo_path, 'rb') as f:
-            files = {'photo': f}
-            data = {}
-            if caption:
-                data['caption'] = caption
-                
-            response = await self.http_client.post(
-                f"/babies/{baby_id}/photos",
-                files=files,
-                data=data
-            )
-            response.raise_for_status()
+        # Read the file in a worker thread so concurrent requests keep running
+        path = Path(photo_path)
+        photo_bytes = await asyncio.to_thread(path.read_bytes)
+        
+        files = {'photo': (path.name, photo_bytes)}
+        data = {}
+        if caption:
+            data['caption'] = caption
+            
+        response = await self.http_client.post(
+            f"/babies/{baby_id}/photos",
+            files=files,
+            data=data,
+            headers=self._auth_headers
+        )
+        response.raise_for_status()
             
-        return response.json().get('photo_url', '')
\ No newline at end of file
+        return orjson.loads(response.content).get('photo_url', '')
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""Shared HTTP connection pools for the API clients."""
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Optional, Sequence
+from aiolimiter import AsyncLimiter
+import httpx
+import orjson
+
+from ..config import RATE_LIMIT_SETTINGS
+
+
+# Each host gets its own pool so Brightwheel and Nara traffic can't starve each other
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30
+)
+
+# Client-side token buckets enforcing RATE_LIMIT_SETTINGS, keyed by service name
+RATE_LIMITERS: Dict[str, Sequence[AsyncLimiter]] = {
+    service: (
+        AsyncLimiter(limits["requests_per_minute"], 60),
+        AsyncLimiter(limits["requests_per_hour"], 3600),
+    )
+    for service, limits in RATE_LIMIT_SETTINGS.items()
+}
+
+# Request bodies are serialized up front, so the content type is set explicitly
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# orjson writes datetimes directly; naive ones are Brightwheel UTC times
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _rate_limit_hook(limiters: Sequence[AsyncLimiter]):
+    """Build a request hook that waits for a slot in every limiter."""
+    async def acquire(request: httpx.Request):
+        for limiter in limiters:
+            await limiter.acquire()
+    return acquire
+
+
+def get_http_client(base_url: str, service: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for a host, creating it on first use.
+    
+    Args:
+        base_url: Base URL of the API host
+        service: Key into RATE_LIMIT_SETTINGS whose limits every request waits on
+        
+    Returns:
+        Pooled HTTP client reused by every API client for that host
+    """
+    client = _clients.get(base_url)
+    if client is None or client.is_closed:
+        event_hooks = {}
+        if service:
+            event_hooks["request"] = [_rate_limit_hook(RATE_LIMITERS[service])]
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=30.0,
+            follow_redirects=True,
+            limits=HTTP_LIMITS,
+            event_hooks=event_hooks,
+            # Shared by every API client instance, so credentials travel with each request instead
+            cookies=CookieJar(DefaultCookiePolicy(allowed_domains=[])),
+            # Concurrent requests to a host multiplex over a single connection
+            http2=True
+        )
+        _clients[base_url] = client
+    return client
+
+
+async def close_http_clients():
+    """Close all shared HTTP clients. Call before the event loop shuts down."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
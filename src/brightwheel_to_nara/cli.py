@@ -0,0 +1,127 @@
+"""Command line interface for the Brightwheel to Nara transfer tool."""
+import asyncio
+import atexit
+import queue
+import sys
+import logging
+import logging.handlers
+import argparse
+
+
+def setup_logging(level: str = "INFO") -> logging.handlers.QueueListener:
+    """
+    Setup logging configuration.
+    
+    Records are queued by the caller and written by a background thread,
+    so logging never blocks the event loop on terminal I/O.
+    
+    Args:
+        level: Root log level name
+        
+    Returns:
+        The started listener; it is also stopped automatically at exit
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper()))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def main() -> None:
+    """Main entry point for the CLI."""
+    parser = argparse.ArgumentParser(
+        description="Transfer data from Brightwheel to Nara Baby Tracker"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Run in dry-run mode (no data will be written to Nara)"
+    )
+    parser.add_argument(
+        "--days-back",
+        type=int,
+        default=7,
+        help="Number of days to sync backward from today (default: 7)"
+    )
+    parser.add_argument(
+        "--force-full",
+        action="store_true",
+        help="Ignore saved checkpoints and resync the full date range"
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="INFO",
+        help="Set logging level (default: INFO)"
+    )
+    parser.add_argument(
+        "--extract-cookie",
+        action="store_true",
+        help="Attempt to extract session cookie from browser and show instructions"
+    )
+    
+    args = parser.parse_args()
+    
+    # Setup logging
+    setup_logging(args.log_level)
+    
+    # Handle cookie extraction
+    if args.extract_cookie:
+        from .utils.cookie_extractor import get_brightwheel_v2_cookie, print_cookie_instructions
+        
+        cookie = get_brightwheel_v2_cookie()
+        if cookie:
+            print(f"Found session cookie: {cookie[:20]}...")
+            print(f"Add this to your .env file:")
+            print(f'BRIGHTWHEEL_SESSION_COOKIE="{cookie}"')
+        else:
+            print_cookie_instructions()
+        return
+    
+    # Deferred so --help and --extract-cookie don't load the API clients
+    from .config import get_settings
+    from .transfer import main as transfer_main
+    
+    # Override settings from command line
+    settings = get_settings()
+    if args.dry_run:
+        settings.dry_run = True
+    if args.days_back:
+        settings.sync_days_back = args.days_back
+    if args.force_full:
+        settings.force_full = True
+        
+    logger = logging.getLogger(__name__)
+    
+    try:
+        # Print banner
+        print("=" * 60)
+        print("Brightwheel to Nara Transfer Tool")
+        print("=" * 60)
+        
+        if settings.dry_run:
+            print("🔍 Running in DRY RUN mode - no data will be written")
+        print(f"📅 Syncing {settings.sync_days_back} days of data")
+        print()
+        
+        # Run the transfer
+        asyncio.run(transfer_main())
+        
+    except KeyboardInterrupt:
+        logger.info("Transfer interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Transfer failed: {e}")
+        sys.exit(1)
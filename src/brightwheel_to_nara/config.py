@@ -1,6 +1,8 @@
 """Configuration management for Brightwheel to Nara transfer."""
 import os
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -31,6 +33,7 @@ class Settings(BaseSettings):
     # Transfer settings
     sync_days_back: int = Field(7, env="SYNC_DAYS_BACK")
     batch_size: int = Field(50, env="BATCH_SIZE")
+    max_concurrent_students: int = Field(4, env="MAX_CONCURRENT_STUDENTS")
     retry_max_attempts: int = Field(3, env="RETRY_MAX_ATTEMPTS")
     retry_delay_seconds: float = Field(1.0, env="RETRY_DELAY_SECONDS")
     
@@ -38,6 +41,7 @@ class Settings(BaseSettings):
     sync_photos: bool = Field(True, env="SYNC_PHOTOS")
     sync_notes: bool = Field(True, env="SYNC_NOTES")
     dry_run: bool = Field(False, env="DRY_RUN")
+    force_full: bool = Field(False, env="FORCE_FULL")
     
     # Logging
     log_level: str = Field("INFO", env="LOG_LEVEL")
@@ -48,12 +52,65 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
+    
+    @classmethod
+    def from_env_fast(cls) -> "Settings":
+        """
+        Build settings from environment variables without pydantic-settings.
+        
+        Handles only the plain field types used here and skips validation,
+        falling back to the full loader whenever a value is missing or
+        can't be coerced so error reporting stays the same.
+        
+        Returns:
+            Settings instance
+        """
+        env = {key.lower(): value for key, value in os.environ.items()}
+        values = {}
+        for name, field in cls.model_fields.items():
+            raw = env.get(name)
+            if raw is None:
+                if field.is_required():
+                    return cls()
+                continue
+            coerce = ENV_COERCERS.get(field.annotation)
+            if coerce is None:
+                return cls()
+            try:
+                values[name] = coerce(raw)
+            except ValueError:
+                return cls()
+        return cls.model_construct(**values)
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment variable the way pydantic does."""
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "t", "yes", "y", "on"):
+        return True
+    if lowered in ("0", "false", "f", "no", "n", "off"):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
+
+
+# Coercion used by Settings.from_env_fast for each field annotation
+ENV_COERCERS = {
+    str: str,
+    Optional[str]: str,
+    int: int,
+    float: float,
+    bool: _parse_bool,
+}
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get application settings.
     
+    The settings are loaded once and shared, so overrides applied by the CLI
+    are seen by every later caller.
+    
     Returns:
         Settings instance
     """
@@ -61,11 +118,11 @@ def get_settings() -> Settings:
     env_file = Path(".env")
     if env_file.exists():
         return Settings(_env_file=env_file)
-    return Settings()
+    return Settings.from_env_fast()
 
 
-# Activity type mappings
-ACTIVITY_TYPE_MAPPING = {
+# Activity type mappings (read-only)
+ACTIVITY_TYPE_MAPPING = MappingProxyType({
     # Brightwheel -> Nara
     "diaper": "diaper",
     "bottle": "feeding",
@@ -78,7 +135,7 @@ ACTIVITY_TYPE_MAPPING = {
     "mood": "mood",
     "incident": "health",
     "medication": "health"
-}
+})
 
 
 # Rate limiting settings
@@ -94,6 +151,10 @@ RATE_LIMIT_SETTINGS = {
 }
 
 
+# Local cache for session and browser state between runs
+CACHE_DIR = Path.home() / ".cache" / "brightwheel_to_nara"
+
+
 # Date/time formats
 DATE_FORMAT = "%Y-%m-%d"
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
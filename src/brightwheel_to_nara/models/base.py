@@ -0,0 +1,11 @@
+"""Model configuration shared by the Brightwheel and Nara models."""
+from pydantic import ConfigDict
+
+
+# Read-only API records: unknown fields are dropped and instances never change after parsing
+FROZEN_RECORD_CONFIG = ConfigDict(
+    extra='ignore',
+    frozen=True,
+    validate_default=False,
+    revalidate_instances='never'
+)
@@ -1,11 +1,13 @@
 """Pydantic models for Brightwheel API."""
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from enum import Enum
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal, Union, Annotated, TypedDict
+from enum import StrEnum
+from pydantic import BaseModel, Discriminator, Field, AliasChoices, AliasPath, Tag, field_validator
 
+from .base import FROZEN_RECORD_CONFIG
 
-class ActivityType(str, Enum):
+
+class ActivityType(StrEnum):
     """Types of activities in Brightwheel."""
     DIAPER = "diaper"
     BOTTLE = "bottle"
@@ -20,7 +22,7 @@ class ActivityType(str, Enum):
     POTTY = "potty"
     
 
-class DiaperType(str, Enum):
+class DiaperType(StrEnum):
     """Types of diaper changes."""
     WET = "wet"
     BM = "bm"
@@ -28,7 +30,7 @@ class DiaperType(str, Enum):
     DRY = "dry"
 
 
-class MoodType(str, Enum):
+class MoodType(StrEnum):
     """Mood types."""
     HAPPY = "happy"
     SAD = "sad"
@@ -87,17 +89,31 @@ class Room(BaseModel):
 
 class Student(BaseModel):
     """Student/Child model."""
+    model_config = FROZEN_RECORD_CONFIG
+    
     id: str
     first_name: str
     last_name: str
     birthdate: datetime
     room_id: Optional[str] = None
-    room_name: Optional[str] = None
-    guardian_ids: List[str] = Field(default_factory=list)
+    room_name: Optional[str] = Field(
+        None,
+        validation_alias=AliasChoices("room_name", AliasPath("room", "name"))
+    )
+    guardian_ids: List[str] = Field(
+        default_factory=list,
+        validation_alias=AliasChoices("guardian_ids", "guardians")
+    )
     profile_photo_url: Optional[str] = None
     allergies: List[str] = Field(default_factory=list)
     medical_notes: Optional[str] = None
     enrollment_status: str = "active"
+    
+    @field_validator("guardian_ids", mode="before")
+    @classmethod
+    def guardian_objects_to_ids(cls, value: Any) -> Any:
+        """Accept embedded guardian objects as returned by the API."""
+        return [g["id"] if isinstance(g, dict) else g for g in value]
 
 
 class Teacher(BaseModel):
@@ -113,6 +129,8 @@ class Teacher(BaseModel):
 # Activity Models
 class BaseActivity(BaseModel):
     """Base activity model."""
+    model_config = FROZEN_RECORD_CONFIG
+    
     id: str
     activity_type: ActivityType
     student_id: str
@@ -126,21 +144,21 @@ class BaseActivity(BaseModel):
     
 class DiaperActivity(BaseActivity):
     """Diaper change activity."""
-    activity_type: ActivityType = ActivityType.DIAPER
+    activity_type: Literal[ActivityType.DIAPER] = ActivityType.DIAPER
     diaper_type: DiaperType
     has_cream: bool = False
 
 
 class BottleActivity(BaseActivity):
     """Bottle feeding activity."""
-    activity_type: ActivityType = ActivityType.BOTTLE
+    activity_type: Literal[ActivityType.BOTTLE] = ActivityType.BOTTLE
     amount_oz: float
     bottle_type: str = "milk"  # milk, formula, etc
     
     
 class FoodActivity(BaseActivity):
     """Food/meal activity."""
-    activity_type: ActivityType = ActivityType.FOOD
+    activity_type: Literal[ActivityType.FOOD] = ActivityType.FOOD
     meal_type: str  # breakfast, lunch, snack, dinner
     foods: List[str] = Field(default_factory=list)
     amount_eaten: Optional[str] = None  # all, most, some, none
@@ -148,7 +166,7 @@ class FoodActivity(BaseActivity):
 
 class NapActivity(BaseActivity):
     """Nap/sleep activity."""
-    activity_type: ActivityType = ActivityType.NAP
+    activity_type: Literal[ActivityType.NAP] = ActivityType.NAP
     start_time: datetime
     end_time: Optional[datetime] = None
     duration_minutes: Optional[int] = None
@@ -156,38 +174,125 @@ class NapActivity(BaseActivity):
 
 class MoodActivity(BaseActivity):
     """Mood observation activity."""
-    activity_type: ActivityType = ActivityType.MOOD
+    activity_type: Literal[ActivityType.MOOD] = ActivityType.MOOD
     mood: MoodType
 
 
 class TemperatureActivity(BaseActivity):
     """Temperature check activity."""
-    activity_type: ActivityType = ActivityType.TEMPERATURE
+    activity_type: Literal[ActivityType.TEMPERATURE] = ActivityType.TEMPERATURE
     temperature_f: float
     method: str = "forehead"  # forehead, ear, oral, etc
 
 
 class PhotoActivity(BaseActivity):
     """Photo activity."""
-    activity_type: ActivityType = ActivityType.PHOTO
+    activity_type: Literal[ActivityType.PHOTO] = ActivityType.PHOTO
     photo_urls: List[str] = Field(default_factory=list)
     caption: Optional[str] = None
 
 
 class PottyActivity(BaseActivity):
     """Potty activity."""
-    activity_type: ActivityType = ActivityType.POTTY
+    activity_type: Literal[ActivityType.POTTY] = ActivityType.POTTY
     success: bool
     potty_type: Optional[str] = None  # pee, poop, both
 
 
+class NoteActivity(BaseActivity):
+    """Free-form note activity."""
+    activity_type: Literal[ActivityType.NOTE] = ActivityType.NOTE
+
+
+class IncidentActivity(BaseActivity):
+    """Incident report activity."""
+    activity_type: Literal[ActivityType.INCIDENT] = ActivityType.INCIDENT
+    description: Optional[str] = None
+    action_taken: Optional[str] = None
+
+
+class MedicationActivity(BaseActivity):
+    """Medication given activity."""
+    activity_type: Literal[ActivityType.MEDICATION] = ActivityType.MEDICATION
+    medication_name: Optional[str] = None
+    dose: Optional[str] = None
+
+
+class ActivityData(TypedDict, total=False):
+    """
+    Raw activity as returned by the activities endpoint.
+    
+    The transfer path reads each activity once while transforming it, so it
+    keeps the decoded dict instead of validating it into a model.
+    """
+    id: str
+    activity_type: str
+    student_id: str
+    timestamp: str
+    notes: Optional[str]
+    diaper_type: str
+    has_cream: bool
+    amount_oz: float
+    bottle_type: str
+    meal_type: str
+    foods: List[str]
+    amount_eaten: Optional[str]
+    start_time: str
+    end_time: Optional[str]
+    duration_minutes: Optional[int]
+    temperature_f: float
+    method: str
+    photo_urls: List[str]
+    caption: Optional[str]
+
+
+# Activity model for each activity_type tag
+_ACTIVITY_MODELS: Dict[ActivityType, type[BaseActivity]] = {
+    ActivityType.DIAPER: DiaperActivity,
+    ActivityType.BOTTLE: BottleActivity,
+    ActivityType.FOOD: FoodActivity,
+    ActivityType.NAP: NapActivity,
+    ActivityType.MOOD: MoodActivity,
+    ActivityType.TEMPERATURE: TemperatureActivity,
+    ActivityType.PHOTO: PhotoActivity,
+    ActivityType.POTTY: PottyActivity,
+    ActivityType.NOTE: NoteActivity,
+    ActivityType.INCIDENT: IncidentActivity,
+    ActivityType.MEDICATION: MedicationActivity,
+}
+
+# Tag for activity types without a model, such as check-ins; those stay plain dicts
+_UNKNOWN_ACTIVITY_TAG = "unknown"
+
+
+def _activity_tag(value: Any) -> str:
+    """Pick the union member for an activity by its activity_type."""
+    if isinstance(value, dict):
+        activity_type = value.get("activity_type")
+    else:
+        activity_type = getattr(value, "activity_type", None)
+    return activity_type if activity_type in _ACTIVITY_MODELS else _UNKNOWN_ACTIVITY_TAG
+
+
+# Any Brightwheel activity, resolved by its activity_type tag in a single lookup
+Activity = Annotated[
+    Union[
+        tuple(Annotated[model, Tag(activity_type.value)] for activity_type, model in _ACTIVITY_MODELS.items())
+        + (Annotated[Dict[str, Any], Tag(_UNKNOWN_ACTIVITY_TAG)],)
+    ],
+    Discriminator(_activity_tag)
+]
+
+
 # Feed Models
 class FeedItem(BaseModel):
     """Feed item containing an activity."""
+    model_config = FROZEN_RECORD_CONFIG
+    
     id: str
     created_at: datetime
     updated_at: datetime
-    activity: Dict[str, Any]  # Can be any activity type
+    activity: Activity
     likes_count: int = 0
     comments_count: int = 0
     is_liked: bool = False
@@ -195,8 +300,8 @@ class FeedItem(BaseModel):
 
 class Feed(BaseModel):
     """Feed response."""
-    items: List[FeedItem]
-    has_more: bool
+    items: List[FeedItem] = Field(default_factory=list)
+    has_more: bool = False
     next_cursor: Optional[str] = None
 
 
@@ -213,7 +318,7 @@ class GetFeedRequest(BaseModel):
 
 class GetStudentsResponse(BaseModel):
     """Response for getting students."""
-    students: List[Student]
+    students: List[Student] = Field(default_factory=list)
     
     
 class GetActivitiesResponse(BaseModel):
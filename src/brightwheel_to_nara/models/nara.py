@@ -1,11 +1,13 @@
 """Pydantic models for Nara Baby Tracker API."""
 from datetime import datetime, time
-from typing import Optional, List, Dict, Any
-from enum import Enum
+from typing import Optional, List, Dict, Any, Literal, Union, Annotated
+from enum import StrEnum
 from pydantic import BaseModel, Field
 
+from .base import FROZEN_RECORD_CONFIG
 
-class NaraActivityType(str, Enum):
+
+class NaraActivityType(StrEnum):
     """Types of activities in Nara."""
     DIAPER = "diaper"
     FEEDING = "feeding"
@@ -22,7 +24,7 @@ class NaraActivityType(str, Enum):
     PLAY = "play"
 
 
-class FeedingType(str, Enum):
+class FeedingType(StrEnum):
     """Types of feeding."""
     BOTTLE = "bottle"
     BREAST = "breast"
@@ -31,7 +33,7 @@ class FeedingType(str, Enum):
     PUMPED = "pumped"
 
 
-class DiaperStatus(str, Enum):
+class DiaperStatus(StrEnum):
     """Diaper status types."""
     WET = "wet"
     DIRTY = "dirty"
@@ -39,7 +41,7 @@ class DiaperStatus(str, Enum):
     DRY = "dry"
 
 
-class SleepType(str, Enum):
+class SleepType(StrEnum):
     """Sleep types."""
     NAP = "nap"
     NIGHT = "night"
@@ -73,6 +75,8 @@ class NaraUser(BaseModel):
 # Core Models
 class Baby(BaseModel):
     """Baby/Child model in Nara."""
+    model_config = FROZEN_RECORD_CONFIG
+    
     id: str
     name: str
     birth_date: datetime
@@ -96,6 +100,8 @@ class Caregiver(BaseModel):
 # Activity Models
 class NaraBaseActivity(BaseModel):
     """Base activity model for Nara."""
+    model_config = FROZEN_RECORD_CONFIG
+    
     id: Optional[str] = None
     baby_id: str
     activity_type: NaraActivityType
@@ -107,7 +113,7 @@ class NaraBaseActivity(BaseModel):
 
 class DiaperRecord(NaraBaseActivity):
     """Diaper change record."""
-    activity_type: NaraActivityType = NaraActivityType.DIAPER
+    activity_type: Literal[NaraActivityType.DIAPER] = NaraActivityType.DIAPER
     status: DiaperStatus
     color: Optional[str] = None
     consistency: Optional[str] = None
@@ -117,7 +123,7 @@ class DiaperRecord(NaraBaseActivity):
 
 class FeedingRecord(NaraBaseActivity):
     """Feeding record."""
-    activity_type: NaraActivityType = NaraActivityType.FEEDING
+    activity_type: Literal[NaraActivityType.FEEDING] = NaraActivityType.FEEDING
     feeding_type: FeedingType
     amount_ml: Optional[float] = None
     duration_minutes: Optional[int] = None
@@ -128,7 +134,7 @@ class FeedingRecord(NaraBaseActivity):
 
 class SleepRecord(NaraBaseActivity):
     """Sleep record."""
-    activity_type: NaraActivityType = NaraActivityType.SLEEP
+    activity_type: Literal[NaraActivityType.SLEEP] = NaraActivityType.SLEEP
     sleep_type: SleepType
     start_time: datetime
     end_time: Optional[datetime] = None
@@ -139,7 +145,7 @@ class SleepRecord(NaraBaseActivity):
 
 class HealthRecord(NaraBaseActivity):
     """Health record."""
-    activity_type: NaraActivityType = NaraActivityType.HEALTH
+    activity_type: Literal[NaraActivityType.HEALTH] = NaraActivityType.HEALTH
     temperature_celsius: Optional[float] = None
     symptoms: List[str] = Field(default_factory=list)
     medications: List[str] = Field(default_factory=list)
@@ -148,7 +154,7 @@ class HealthRecord(NaraBaseActivity):
 
 class MeasurementRecord(NaraBaseActivity):
     """Growth measurement record."""
-    activity_type: NaraActivityType = NaraActivityType.MEASUREMENT
+    activity_type: Literal[NaraActivityType.MEASUREMENT] = NaraActivityType.MEASUREMENT
     weight_kg: Optional[float] = None
     height_cm: Optional[float] = None
     head_circumference_cm: Optional[float] = None
@@ -156,42 +162,58 @@ class MeasurementRecord(NaraBaseActivity):
 
 class PhotoRecord(NaraBaseActivity):
     """Photo record."""
-    activity_type: NaraActivityType = NaraActivityType.PHOTO
+    activity_type: Literal[NaraActivityType.PHOTO] = NaraActivityType.PHOTO
     photo_url: str
     caption: Optional[str] = None
     
 
 class MilestoneRecord(NaraBaseActivity):
     """Milestone record."""
-    activity_type: NaraActivityType = NaraActivityType.MILESTONE
+    activity_type: Literal[NaraActivityType.MILESTONE] = NaraActivityType.MILESTONE
     milestone_name: str
     category: str  # motor, cognitive, social, language
 
 
 class PumpingRecord(NaraBaseActivity):
     """Pumping record."""
-    activity_type: NaraActivityType = NaraActivityType.PUMPING
+    activity_type: Literal[NaraActivityType.PUMPING] = NaraActivityType.PUMPING
     amount_ml: float
     duration_minutes: Optional[int] = None
     
 
 class TummyTimeRecord(NaraBaseActivity):
     """Tummy time record."""
-    activity_type: NaraActivityType = NaraActivityType.TUMMY_TIME
+    activity_type: Literal[NaraActivityType.TUMMY_TIME] = NaraActivityType.TUMMY_TIME
     duration_minutes: int
     
 
 class PlayRecord(NaraBaseActivity):
     """Play activity record."""
-    activity_type: NaraActivityType = NaraActivityType.PLAY
+    activity_type: Literal[NaraActivityType.PLAY] = NaraActivityType.PLAY
     activity_name: str
     duration_minutes: Optional[int] = None
     
 
+# Any Nara activity record, resolved by its activity_type tag in a single lookup
+NaraActivity = Annotated[
+    Union[
+        DiaperRecord, FeedingRecord, SleepRecord, HealthRecord,
+        MeasurementRecord, PhotoRecord, MilestoneRecord, PumpingRecord,
+        TummyTimeRecord, PlayRecord
+    ],
+    Field(discriminator="activity_type")
+]
+
+
 # Request/Response Models
+class GetBabiesResponse(BaseModel):
+    """Response for getting babies."""
+    babies: List[Baby] = Field(default_factory=list)
+
+
 class CreateActivityRequest(BaseModel):
     """Request to create an activity."""
-    activity: Dict[str, Any]  # Can be any activity type
+    activity: NaraActivity
 
 
 class CreateActivityResponse(BaseModel):
@@ -201,6 +223,11 @@ class CreateActivityResponse(BaseModel):
     activity: Dict[str, Any]
 
 
+class BatchCreateActivitiesResponse(BaseModel):
+    """Response after creating several activities in one request."""
+    activities: List[CreateActivityResponse] = Field(default_factory=list)
+
+
 class GetActivitiesRequest(BaseModel):
     """Request to get activities."""
     baby_id: str
@@ -1,23 +1,74 @@
 """Main transfer logic for syncing data from Brightwheel to Nara."""
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import difflib
+import itertools
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
-from .api import BrightwheelClient, NaraClient
-from .config import get_settings, ACTIVITY_TYPE_MAPPING
+from .api import BrightwheelClient, NaraClient, close_http_clients
+from .config import get_settings
 from .utils import (
-    transform_activity,
+    transform_activities,
     ErrorLogger,
-    retry_with_backoff,
-    TransferError
+    TransferError,
+    CheckpointStore,
+    SentActivityStore,
+    activity_digest,
+    activity_timestamp,
+    as_utc
 )
-from .models.brightwheel import Student, ActivityType
-from .models.nara import Baby, NaraActivityType
+from .models.brightwheel import Student, ActivityData
+from .models.nara import Baby
 
 
 logger = logging.getLogger(__name__)
 
+# Activity batches posted to Nara at the same time for one student
+MAX_CONCURRENT_BATCHES = 4
+
+# How far before a student's checkpoint a resumed sync refetches, so activities
+# entered late or sharing the checkpoint time aren't missed; the sent-activity
+# store skips the ones already created
+CHECKPOINT_OVERLAP = timedelta(days=3)
+
+# Minimum similarity for an approximate first-name match between a student and a baby
+FUZZY_NAME_CUTOFF = 0.8
+
+
+def _fuzzy_match_baby(first_name: str, candidates: List[Baby]) -> Optional[Baby]:
+    """
+    Pick the baby whose first name is closest to a student's.
+    
+    A name of three or more letters that starts the other (Alex and Alexander)
+    always qualifies; otherwise the names must be at least FUZZY_NAME_CUTOFF
+    similar. Ties are treated as ambiguous.
+    
+    Args:
+        first_name: Lowercased student first name
+        candidates: Babies sharing the student's birthdate
+        
+    Returns:
+        The closest baby, or None if there is no unambiguous match
+    """
+    scored = []
+    for baby in candidates:
+        baby_name = baby.name.split()[0].lower()
+        shorter, longer = sorted((first_name, baby_name), key=len)
+        if len(shorter) >= 3 and longer.startswith(shorter):
+            score = 1.0
+        else:
+            score = difflib.SequenceMatcher(None, first_name, baby_name).ratio()
+        if score >= FUZZY_NAME_CUTOFF:
+            scored.append((score, baby))
+            
+    if not scored:
+        return None
+    scored.sort(key=lambda item: item[0], reverse=True)
+    if len(scored) > 1 and scored[0][0] == scored[1][0]:
+        return None
+    return scored[0][1]
+
 
 class DataTransfer:
     """Orchestrates data transfer from Brightwheel to Nara."""
@@ -25,9 +76,17 @@ class DataTransfer:
     def __init__(self):
         """Initialize the data transfer."""
         self.settings = get_settings()
-        self.brightwheel_client = BrightwheelClient()
-        self.nara_client = NaraClient()
+        self.brightwheel_client = BrightwheelClient(
+            max_retries=self.settings.retry_max_attempts,
+            retry_delay=self.settings.retry_delay_seconds
+        )
+        self.nara_client = NaraClient(
+            max_retries=self.settings.retry_max_attempts,
+            retry_delay=self.settings.retry_delay_seconds
+        )
         self.error_logger = ErrorLogger()
+        self.checkpoints = CheckpointStore()
+        self.sent_activities = SentActivityStore()
         
     async def __aenter__(self):
         """Async context manager entry."""
@@ -39,6 +98,7 @@ class DataTransfer:
         """Async context manager exit."""
         await self.brightwheel_client.__aexit__(exc_type, exc_val, exc_tb)
         await self.nara_client.__aexit__(exc_type, exc_val, exc_tb)
+        self.sent_activities.close()
         
     async def authenticate(self):
         """Authenticate with both platforms."""
@@ -95,24 +155,45 @@ class DataTransfer:
         """
         mapping = {}
         
+        # Index babies by first name and birthdate; the first baby wins on duplicates
+        baby_index: Dict[Tuple[str, date], Baby] = {}
+        babies_by_birthdate: Dict[date, List[Baby]] = {}
+        for baby in babies:
+            baby_index.setdefault((baby.name.split()[0].lower(), baby.birth_date.date()), baby)
+            babies_by_birthdate.setdefault(baby.birth_date.date(), []).append(baby)
+        
+        unmatched = []
         for student in students:
             # Try to match by name and birthdate
-            for baby in babies:
-                if (student.first_name.lower() == baby.name.split()[0].lower() and
-                    student.birthdate.date() == baby.birth_date.date()):
-                    mapping[student.id] = baby.id
-                    logger.info(f"Mapped {student.first_name} {student.last_name} to {baby.name}")
-                    break
+            baby = baby_index.get((student.first_name.lower(), student.birthdate.date()))
+            if baby:
+                mapping[student.id] = baby.id
+                logger.info("Mapped %s %s to %s", student.first_name, student.last_name, baby.name)
+            else:
+                unmatched.append(student)
+                
+        # Fall back to approximate names (nicknames, typos) among unclaimed babies born the same day
+        claimed = set(mapping.values())
+        for student in unmatched:
+            candidates = [
+                baby for baby in babies_by_birthdate.get(student.birthdate.date(), [])
+                if baby.id not in claimed
+            ]
+            baby = _fuzzy_match_baby(student.first_name.lower(), candidates)
+            if baby:
+                mapping[student.id] = baby.id
+                claimed.add(baby.id)
+                logger.info("Mapped %s %s to %s by approximate name", student.first_name, student.last_name, baby.name)
             else:
-                logger.warning(f"Could not find matching baby for {student.first_name} {student.last_name}")
+                logger.warning("Could not find matching baby for %s %s", student.first_name, student.last_name)
                 
         return mapping
     
     async def transfer_activity(
         self,
-        activity: Dict[str, Any],
+        activity: ActivityData,
         baby_id: str
-    ) -> bool:
+    ) -> Optional[bool]:
         """
         Transfer a single activity to Nara.
         
@@ -121,42 +202,96 @@ class DataTransfer:
             baby_id: Nara baby ID
             
         Returns:
-            True if successful, False otherwise
+            True if successful, False if it failed, None if the type is unsupported
         """
-        try:
-            # Transform the activity
-            nara_activity = transform_activity(activity)
-            if not nara_activity:
-                logger.debug(f"Skipping unsupported activity type: {activity.get('activity_type')}")
-                return False
+        results = await self.transfer_batch([activity], baby_id)
+        return results[0]
+    
+    async def transfer_batch(
+        self,
+        activities: List[ActivityData],
+        baby_id: str
+    ) -> List[Optional[bool]]:
+        """
+        Transfer a batch of activities to Nara with as few requests as possible.
+        
+        Args:
+            activities: Brightwheel activity data
+            baby_id: Nara baby ID
+            
+        Returns:
+            For each activity, True if transferred, False if it failed and
+            None if its type is unsupported
+        """
+        results: List[Optional[bool]] = [False] * len(activities)
+        ready: List[Tuple[int, Dict[str, Any]]] = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # Transform the activities; unsupported types come back as None
+        transformed = transform_activities(activities)
+        for index, (activity, nara_activity) in enumerate(zip(activities, transformed)):
+            if isinstance(nara_activity, Exception):
+                self._log_transfer_error(activity, baby_id, nara_activity)
+                continue
+            if nara_activity is None:
+                if debug:
+                    logger.debug("Skipping unsupported activity type: %s", activity.get('activity_type'))
+                results[index] = None
+                continue
                 
             # Set the baby ID
             nara_activity['baby_id'] = baby_id
+            ready.append((index, nara_activity))
             
-            # Skip if dry run
-            if self.settings.dry_run:
-                logger.info(f"[DRY RUN] Would create {nara_activity['activity_type']} activity")
-                return True
+        # Skip activities an earlier run already created, without a request
+        digests = {index: activity_digest(nara_activity) for index, nara_activity in ready}
+        already_sent = self.sent_activities.find_sent(digests.values())
+        if already_sent:
+            for index, _ in ready:
+                if digests[index] in already_sent:
+                    results[index] = None
+            ready = [(index, nara_activity) for index, nara_activity in ready if digests[index] not in already_sent]
+            if debug:
+                logger.debug("Skipping %d activities already sent to Nara", len(already_sent))
                 
-            # Create the activity in Nara
-            await retry_with_backoff(
-                lambda: self.nara_client.create_generic_activity(baby_id, nara_activity),
-                max_retries=self.settings.retry_max_attempts,
-                initial_delay=self.settings.retry_delay_seconds
-            )
+        if not ready:
+            return results
             
-            logger.debug(f"Successfully transferred {activity.get('activity_type')} activity")
-            return True
+        # Skip if dry run
+        if self.settings.dry_run:
+            for index, nara_activity in ready:
+                logger.info("[DRY RUN] Would create %s activity", nara_activity['activity_type'])
+                results[index] = True
+            return results
             
-        except Exception as e:
-            self.error_logger.log_error(
-                activity_id=activity.get('id', 'unknown'),
-                activity_type=activity.get('activity_type', 'unknown'),
-                error=e,
-                context={'baby_id': baby_id}
+        # Create the activities in Nara; failures are retried on the next run, not resent here
+        try:
+            responses = await self.nara_client.create_generic_activities_batch(
+                baby_id, [nara_activity for _, nara_activity in ready]
             )
-            logger.error(f"Failed to transfer activity: {e}")
-            return False
+        except Exception as e:
+            responses = [e] * len(ready)
+            
+        for (index, _), response in zip(ready, responses):
+            if isinstance(response, BaseException):
+                self._log_transfer_error(activities[index], baby_id, response)
+            else:
+                if debug:
+                    logger.debug("Successfully transferred %s activity", activities[index].get('activity_type'))
+                results[index] = True
+                
+        self.sent_activities.add(digests[index] for index, _ in ready if results[index])
+                
+        return results
+    
+    def _log_transfer_error(self, activity: ActivityData, baby_id: str, error: BaseException):
+        """Record a failed activity transfer."""
+        self.error_logger.log_error(
+            activity_id=activity.get('id', 'unknown'),
+            activity_type=activity.get('activity_type', 'unknown'),
+            error=error,
+            context={'baby_id': baby_id}
+        )
     
     async def sync_student_activities(
         self,
@@ -186,37 +321,66 @@ class DataTransfer:
         
         logger.info(f"Syncing activities for {student.first_name} {student.last_name}")
         
-        # Get activities from Brightwheel
-        activities = await self.brightwheel_client.get_activities(
-            student_id=student.id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        # Resume shortly before the last activity a previous run transferred cleanly
+        start_date = as_utc(start_date)
+        end_date = as_utc(end_date)
+        checkpoint = None if self.settings.force_full else self.checkpoints.get(student.id)
+        if checkpoint and checkpoint - CHECKPOINT_OVERLAP > start_date:
+            logger.info(f"Resuming from checkpoint {checkpoint.isoformat()}")
+            start_date = checkpoint - CHECKPOINT_OVERLAP
+        # Latest activity actually created in Nara; the next checkpoint
+        latest: Optional[datetime] = None
         
-        stats['total'] = len(activities)
-        logger.info(f"Found {len(activities)} activities to sync")
+        # Send up to batch_size activities per request, with a few batches in flight
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
         
-        # Process in batches
-        batch_size = self.settings.batch_size
-        for i in range(0, len(activities), batch_size):
-            batch = activities[i:i + batch_size]
-            
-            # Process batch concurrently
-            tasks = [
-                self.transfer_activity(activity, baby_id)
-                for activity in batch
-            ]
-            results = await asyncio.gather(*tasks)
+        async def transfer_guarded(
+            batch: List[ActivityData]
+        ) -> Tuple[List[ActivityData], List[Optional[bool]]]:
+            async with semaphore:
+                return batch, await self.transfer_batch(batch, baby_id)
+                
+        # Start transferring each window as soon as it arrives while later windows are still fetching;
+        # if anything fails, the task group cancels the batches still in flight
+        transfers = []
+        try:
+            async with asyncio.TaskGroup() as batches:
+                async for activities in self.brightwheel_client.iter_activity_windows(
+                    student_id=student.id,
+                    start_date=start_date,
+                    end_date=end_date
+                ):
+                    stats['total'] += len(activities)
+                    transfers.extend(
+                        batches.create_task(transfer_guarded(list(batch)))
+                        for batch in itertools.batched(activities, self.settings.batch_size)
+                    )
+                logger.info(f"Found {stats['total']} activities to sync")
+        except ExceptionGroup as group:
+            # Surface the failure itself, as a plain await would
+            raise group.exceptions[0]
+        finally:
+            # One commit per student for everything created, even if a batch failed
+            self.sent_activities.flush()
             
-            # Update statistics
-            for success in results:
+        for transfer in transfers:
+            batch, results = transfer.result()
+            for activity, success in zip(batch, results):
+                # Update statistics
                 if success is True:
                     stats['successful'] += 1
+                    ts = activity_timestamp(activity)
+                    if ts is not None and (latest is None or ts > latest):
+                        latest = ts
                 elif success is False:
                     stats['failed'] += 1
                 else:
                     stats['skipped'] += 1
                     
+        # Only advance when nothing failed, so failures are retried next run
+        if latest and not stats['failed'] and not self.settings.dry_run:
+            self.checkpoints.set(student.id, latest)
+            
         return stats
     
     async def run(self):
@@ -253,7 +417,7 @@ class DataTransfer:
                 logger.info("Running in read-only mode. Skipping Nara operations.")
                 
             # Calculate date range
-            end_date = datetime.utcnow()
+            end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=self.settings.sync_days_back)
             
             logger.info(f"Syncing activities from {start_date.date()} to {end_date.date()}")
@@ -266,20 +430,41 @@ class DataTransfer:
                 'skipped': 0
             }
             
-            for student in students:
-                baby_id = student_baby_mapping.get(student.id)
-                if not baby_id:
-                    logger.warning(f"Skipping {student.first_name} {student.last_name} - no matching baby")
-                    continue
-                    
-                stats = await self.sync_student_activities(
-                    student=student,
-                    baby_id=baby_id,
-                    start_date=start_date,
-                    end_date=end_date
-                )
+            # Students sync independently, so overlap them up to the configured limit
+            semaphore = asyncio.Semaphore(self.settings.max_concurrent_students)
+            
+            async def sync_one(student: Student, baby_id: str) -> Dict[str, int]:
+                async with semaphore:
+                    return await self.sync_student_activities(
+                        student=student,
+                        baby_id=baby_id,
+                        start_date=start_date,
+                        end_date=end_date
+                    )
+            
+            # map_students_to_babies already named each unmatched student
+            pairs = [
+                (student, student_baby_mapping[student.id])
+                for student in students
+                if student.id in student_baby_mapping
+            ]
+            if len(pairs) < len(students):
+                logger.warning("Skipping %d students without matching babies", len(students) - len(pairs))
                 
-                # Update total statistics
+            # A failing student cancels the others before the shared clients close
+            try:
+                async with asyncio.TaskGroup() as syncs:
+                    tasks = [syncs.create_task(sync_one(student, baby_id)) for student, baby_id in pairs]
+            except ExceptionGroup as group:
+                raise group.exceptions[0]
+            finally:
+                # Students that finished cleanly keep their checkpoints either way
+                if not self.settings.dry_run:
+                    self.checkpoints.save()
+                    
+            # Update total statistics
+            for task in tasks:
+                stats = task.result()
                 for key in total_stats:
                     total_stats[key] += stats[key]
                     
@@ -300,12 +485,10 @@ class DataTransfer:
 
 
 async def main():
-    """Main entry point for the transfer process."""
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    async with DataTransfer() as transfer:
-        await transfer.run()
\ No newline at end of file
+    """Main entry point for the transfer process. Logging is configured by cli.setup_logging."""
+    try:
+        async with DataTransfer() as transfer:
+            await transfer.run()
+    finally:
+        # Close pooled connections while the event loop is still running
+        await close_http_clients()
@@ -1,6 +1,7 @@
 """Utility functions for Brightwheel to Nara transfer."""
 from .transformers import (
     transform_activity,
+    transform_activities,
     transform_diaper_activity,
     transform_bottle_activity,
     transform_food_activity,
@@ -20,18 +21,25 @@ from .errors import (
     TransferError,
     handle_http_errors,
     retry_with_backoff,
+    retry_transient_errors,
+    retry_unsent_requests,
+    is_transient_error,
+    is_unsent_request_error,
+    ErrorEntry,
     ErrorLogger
 )
-from .cookie_extractor import (
-    get_brightwheel_v2_cookie,
-    print_cookie_instructions,
-    extract_chrome_cookies,
-    extract_firefox_cookies
+from .checkpoint import (
+    CheckpointStore,
+    SentActivityStore,
+    activity_digest,
+    activity_timestamp,
+    as_utc
 )
 
 __all__ = [
     # Transformers
     "transform_activity",
+    "transform_activities",
     "transform_diaper_activity",
     "transform_bottle_activity",
     "transform_food_activity",
@@ -50,10 +58,43 @@ __all__ = [
     "TransferError",
     "handle_http_errors",
     "retry_with_backoff",
+    "retry_transient_errors",
+    "retry_unsent_requests",
+    "is_transient_error",
+    "is_unsent_request_error",
+    "ErrorEntry",
     "ErrorLogger",
+    # Checkpoints
+    "CheckpointStore",
+    "SentActivityStore",
+    "activity_digest",
+    "activity_timestamp",
+    "as_utc",
     # Cookie extraction
     "get_brightwheel_v2_cookie",
     "print_cookie_instructions",
     "extract_chrome_cookies",
-    "extract_firefox_cookies"
-]
\ No newline at end of file
+    "extract_firefox_cookies",
+    "extract_specific_cookie",
+    "BrowserCookieSession"
+]
+
+# Cookie extraction is only used by --extract-cookie, so load it on first access
+_LAZY_COOKIE_EXTRACTOR = frozenset({
+    "get_brightwheel_v2_cookie",
+    "print_cookie_instructions",
+    "extract_chrome_cookies",
+    "extract_firefox_cookies",
+    "extract_specific_cookie",
+    "BrowserCookieSession"
+})
+
+
+def __getattr__(name: str):
+    """Import cookie extraction helpers on first use."""
+    if name in _LAZY_COOKIE_EXTRACTOR:
+        from . import cookie_extractor
+        value = getattr(cookie_extractor, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
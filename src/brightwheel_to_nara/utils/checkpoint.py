@@ -0,0 +1,179 @@
+"""Resume state: per-student checkpoints and digests of activities already sent."""
+import hashlib
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+import orjson
+
+from ..config import CACHE_DIR
+from ..models.brightwheel import ActivityData
+
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = CACHE_DIR / "checkpoints.json"
+SENT_ACTIVITIES_DB = CACHE_DIR / "sent_activities.sqlite3"
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC so they compare with API timestamps."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def activity_timestamp(activity: ActivityData) -> Optional[datetime]:
+    """
+    Get when an activity happened.
+    
+    Args:
+        activity: Brightwheel activity data
+    
+    Returns:
+        Activity time in UTC, or None if it has no parseable time
+    """
+    raw = activity.get('timestamp') or activity.get('start_time')
+    if not raw:
+        return None
+    try:
+        return as_utc(datetime.fromisoformat(raw))
+    except (TypeError, ValueError):
+        return None
+
+
+class CheckpointStore:
+    """Last transferred activity time per student, persisted as JSON."""
+    
+    __slots__ = ("path", "_checkpoints")
+    
+    def __init__(self, path: Path = CHECKPOINT_FILE):
+        """
+        Load checkpoints from disk.
+        
+        Args:
+            path: JSON file holding the checkpoints
+        """
+        self.path = path
+        self._checkpoints: Dict[str, datetime] = {}
+        try:
+            stored = orjson.loads(path.read_bytes())
+            self._checkpoints = {
+                student_id: datetime.fromisoformat(value)
+                for student_id, value in stored.items()
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint file {path}: {e}")
+    
+    def get(self, student_id: str) -> Optional[datetime]:
+        """Get the last transferred activity time for a student."""
+        return self._checkpoints.get(student_id)
+    
+    def set(self, student_id: str, timestamp: datetime):
+        """Advance a student's checkpoint; earlier times are ignored."""
+        current = self._checkpoints.get(student_id)
+        if current is None or timestamp > current:
+            self._checkpoints[student_id] = timestamp
+    
+    def save(self):
+        """Write checkpoints to disk, replacing the previous file atomically."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_bytes(orjson.dumps(self._checkpoints))
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Could not write checkpoint file {self.path}: {e}")
+
+
+
+def activity_digest(nara_activity: Dict[str, Any]) -> bytes:
+    """
+    Hash the content of an activity as it would be sent to Nara.
+    
+    Args:
+        nara_activity: Transformed activity, including its baby_id
+        
+    Returns:
+        16-byte digest that is stable across runs
+    """
+    payload = orjson.dumps(nara_activity, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class SentActivityStore:
+    """
+    Digests of activities already created in Nara, persisted in SQLite.
+    
+    New digests are held in memory until flush() writes them in one
+    transaction, so recording a batch never waits on a disk commit.
+    """
+    
+    __slots__ = ("_db", "_pending")
+    
+    def __init__(self, path: Path = SENT_ACTIVITIES_DB):
+        """
+        Open the store, falling back to an in-memory one if the file can't be used.
+        
+        Args:
+            path: SQLite database file
+        """
+        self._pending: Set[bytes] = set()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path)
+            self._create_table()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open {path}, duplicates won't be remembered: {e}")
+            self._db = sqlite3.connect(":memory:")
+            self._create_table()
+            
+    def _create_table(self):
+        """Create the digest table if it doesn't exist."""
+        self._db.execute("CREATE TABLE IF NOT EXISTS sent (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        
+    def find_sent(self, digests: Iterable[bytes]) -> Set[bytes]:
+        """
+        Find which digests have already been sent.
+        
+        Args:
+            digests: Activity digests to check
+            
+        Returns:
+            The subset of digests already recorded
+        """
+        digests = list(digests)
+        if not digests:
+            return set()
+        sent = self._pending.intersection(digests)
+        placeholders = ",".join("?" * len(digests))
+        rows = self._db.execute(
+            f"SELECT digest FROM sent WHERE digest IN ({placeholders})", digests
+        )
+        sent.update(row[0] for row in rows)
+        return sent
+        
+    def add(self, digests: Iterable[bytes]):
+        """Record digests of activities created successfully, until the next flush."""
+        self._pending.update(digests)
+        
+    def flush(self):
+        """Write the recorded digests to disk in one transaction."""
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO sent (digest) VALUES (?)",
+                ((digest,) for digest in self._pending)
+            )
+        self._pending.clear()
+            
+    def close(self):
+        """Write any recorded digests and close the database connection."""
+        try:
+            self.flush()
+        finally:
+            self._db.close()
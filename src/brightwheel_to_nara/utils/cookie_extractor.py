@@ -1,55 +1,312 @@
 """Utility to extract session cookies from browser."""
-import json
+import hashlib
+import os
 import sqlite3
+import subprocess
+import sys
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Any, Iterator, List, Optional, Dict, Sequence, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Chrome derives its cookie key from this salt and a per-platform password
+CHROME_KEY_SALT = b"saltysalt"
+CHROME_KEY_IV = b" " * 16
 
-def extract_chrome_cookies(domain: str = "mybrightwheel.com") -> Dict[str, str]:
+# Chrome user data directories; each profile inside has its own cookie database
+CHROME_USER_DATA_DIRS = (
+    "~/Library/Application Support/Google/Chrome",  # macOS
+    "~/.config/google-chrome",  # Linux
+    "~/AppData/Local/Google/Chrome/User Data",  # Windows
+)
+
+# SQLite's default limit on databases attached to one connection
+MAX_ATTACHED_DATABASES = 10
+
+# Firefox profile directories
+FIREFOX_PROFILE_ROOTS = (
+    "~/Library/Application Support/Firefox/Profiles",  # macOS
+    "~/.mozilla/firefox",  # Linux
+    "~/AppData/Roaming/Mozilla/Firefox/Profiles",  # Windows
+)
+
+def _read_only_uri(path: Path) -> str:
+    """Build the SQLite URI opening a database read-only."""
+    return f"file:{path}?mode=ro"
+
+
+def _connect_read_only(path: Path) -> sqlite3.Connection:
     """
-    Extract cookies from Chrome's cookie database.
+    Open a browser cookie database without writing to it.
+    
+    The database is opened read-only, not immutable: while the browser runs,
+    recent cookie writes are still in its -wal file, and only a normal
+    read-only connection sees them.
+    """
+    return sqlite3.connect(_read_only_uri(path), uri=True)
+
+
+def _get_chrome_key() -> Optional[bytes]:
+    """
+    Derive the key Chrome encrypts cookie values with.
+    
+    Returns:
+        AES key, or None if it can't be derived on this platform
+    """
+    if sys.platform == "darwin":
+        try:
+            password = subprocess.run(
+                ["security", "find-generic-password", "-w", "-s", "Chrome Safe Storage"],
+                capture_output=True, check=True, text=True
+            ).stdout.strip().encode()
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning(f"Could not read Chrome Safe Storage password: {e}")
+            return None
+        return hashlib.pbkdf2_hmac("sha1", password, CHROME_KEY_SALT, 1003, 16)
+    if sys.platform.startswith("linux"):
+        # Chrome falls back to this fixed password when no keyring is available
+        return hashlib.pbkdf2_hmac("sha1", b"peanuts", CHROME_KEY_SALT, 1, 16)
+    return None
+
+
+def _decrypt_chrome_value(encrypted_value: bytes, host_key: str, key: bytes) -> Optional[str]:
+    """
+    Decrypt a Chrome cookie value.
     
     Args:
-        domain: Domain to extract cookies for
+        encrypted_value: Raw encrypted_value column
+        host_key: Cookie host, which newer Chrome versions prefix as a hash
+        key: Key from _get_chrome_key
         
     Returns:
-        Dictionary of cookie name -> value pairs
+        Decrypted cookie value, or None if it can't be decrypted
     """
-    cookies = {}
+    if encrypted_value[:3] != b"v10":
+        # v11 (keyring) and Windows app-bound values are not supported
+        return None
+        
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
     
-    # Chrome cookie database locations
-    chrome_paths = [
-        "~/Library/Application Support/Google/Chrome/Default/Cookies",  # macOS
-        "~/.config/google-chrome/Default/Cookies",  # Linux
-        "~/AppData/Local/Google/Chrome/User Data/Default/Cookies",  # Windows
-    ]
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(CHROME_KEY_IV)).decryptor()
+    padded = decryptor.update(encrypted_value[3:]) + decryptor.finalize()
+    if not padded or padded[-1] > 16:
+        return None
+    value = padded[:-padded[-1]]
     
-    for path_str in chrome_paths:
-        path = Path(path_str).expanduser()
-        if path.exists():
+    # Chrome 130+ prepends the SHA-256 of the host to the value
+    if value[:32] == hashlib.sha256(host_key.encode()).digest():
+        value = value[32:]
+    try:
+        return value.decode()
+    except UnicodeDecodeError:
+        return None
+
+
+class BrowserCookieSession:
+    """
+    Keeps browser cookie databases open across several queries.
+    
+    Each group of databases is opened and attached once, on first use, and
+    every connection is closed when the session exits.
+    """
+    
+    __slots__ = ("_conns",)
+    
+    def __init__(self):
+        """Start a session with no open databases."""
+        self._conns: Dict[Tuple[Path, ...], Tuple[sqlite3.Connection, List[str]]] = {}
+        
+    def __enter__(self) -> "BrowserCookieSession":
+        return self
+        
+    def __exit__(self, *exc_info):
+        self.close()
+        
+    def get(self, paths: Sequence[Path]) -> Tuple[sqlite3.Connection, List[str]]:
+        """
+        Get a connection with all of the given databases available.
+        
+        Args:
+            paths: Databases to open; at most MAX_ATTACHED_DATABASES + 1
+            
+        Returns:
+            Tuple of (connection, schema name of each database in paths order)
+        """
+        key = tuple(paths)
+        entry = self._conns.get(key)
+        if entry is None:
+            conn = _connect_read_only(key[0])
             try:
-                conn = sqlite3.connect(str(path))
-                cursor = conn.cursor()
-                
-                # Query for cookies from the domain
-                cursor.execute(
-                    "SELECT name, value FROM cookies WHERE host_key LIKE ?",
-                    (f"%{domain}",)
-                )
-                
-                for name, value in cursor.fetchall():
-                    cookies[name] = value
-                    
+                schemas = ["main"]
+                for index, path in enumerate(key[1:]):
+                    conn.execute(f"ATTACH DATABASE ? AS p{index}", (_read_only_uri(path),))
+                    schemas.append(f"p{index}")
+            except sqlite3.Error:
                 conn.close()
-                logger.info(f"Extracted {len(cookies)} cookies from Chrome")
-                break
-                
-            except Exception as e:
-                logger.warning(f"Failed to read Chrome cookies: {e}")
+                raise
+            entry = self._conns[key] = (conn, schemas)
+        return entry
+        
+    def close(self):
+        """Close every connection opened by this session."""
+        for conn, _ in self._conns.values():
+            conn.close()
+        self._conns.clear()
+
+
+def _query_databases(
+    paths: Sequence[Path],
+    select: str,
+    params: Tuple[Any, ...],
+    session: Optional[BrowserCookieSession] = None
+) -> List[Tuple[Any, ...]]:
+    """
+    Run one SELECT over several databases through a single connection.
+    
+    The databases are attached to the first one and the per-database SELECTs
+    are combined with UNION ALL, so SQLite plans and runs a single statement.
+    
+    Args:
+        paths: Databases to query, in priority order
+        select: SELECT statement with a {db} placeholder for the schema name
+        params: Parameters for one SELECT; repeated for each database
+        session: Session to reuse connections from; one is opened for this query if not given
+        
+    Returns:
+        Rows from all databases, in the order of paths
+    """
+    if session is None:
+        with BrowserCookieSession() as session:
+            return _query_databases(paths, select, params, session)
+            
+    rows = []
+    group_size = MAX_ATTACHED_DATABASES + 1
+    for start in range(0, len(paths), group_size):
+        conn, schemas = session.get(paths[start:start + group_size])
+        query = " UNION ALL ".join(select.format(db=schema) for schema in schemas)
+        rows.extend(conn.execute(query, params * len(schemas)))
+    return rows
+
+
+def _read_chrome_db(
+    paths: Sequence[Path],
+    domain: str,
+    name: Optional[str] = None,
+    session: Optional[BrowserCookieSession] = None
+) -> Dict[str, str]:
+    """Read and decrypt the cookies for a domain, or just one of them, from Chrome profiles."""
+    # Query for cookies from the domain
+    if name is None:
+        rows = _query_databases(
+            paths,
+            "SELECT host_key, name, value, encrypted_value FROM {db}.cookies WHERE host_key LIKE ?",
+            (f"%{domain}",),
+            session
+        )
+    else:
+        rows = _query_databases(
+            paths,
+            "SELECT host_key, name, value, encrypted_value FROM {db}.cookies "
+            "WHERE host_key LIKE ? AND name = ?",
+            (f"%{domain}", name),
+            session
+        )
+        
+    cookies = {}
+    key = None
+    for host_key, cookie_name, value, encrypted_value in rows:
+        # Earlier profiles win, so Default takes precedence
+        if cookie_name in cookies:
+            continue
+        # Current Chrome versions leave value empty and store it encrypted
+        if not value and encrypted_value:
+            key = key or _get_chrome_key()
+            if key is None:
                 continue
+            value = _decrypt_chrome_value(encrypted_value, host_key, key)
+        if value:
+            cookies[cookie_name] = value
+    return cookies
+
+
+def _read_firefox_db(
+    paths: Sequence[Path],
+    domain: str,
+    name: Optional[str] = None,
+    session: Optional[BrowserCookieSession] = None
+) -> Dict[str, str]:
+    """Read the cookies for a domain, or just one of them, from Firefox databases."""
+    if name is None:
+        return dict(_query_databases(
+            paths,
+            "SELECT name, value FROM {db}.moz_cookies WHERE host LIKE ?",
+            (f"%{domain}",),
+            session
+        ))
+    return dict(_query_databases(
+        paths,
+        "SELECT name, value FROM {db}.moz_cookies WHERE host LIKE ? AND name = ?",
+        (f"%{domain}", name),
+        session
+    ))
+
+
+def _profile_dirs(root: Path) -> List[os.DirEntry]:
+    """List the subdirectories of a browser profile root in one directory scan."""
+    try:
+        with os.scandir(root) as entries:
+            return [entry for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _chrome_databases() -> Iterator[List[Path]]:
+    """Yield the cookie databases of every Chrome profile, grouped by installation."""
+    for user_data_str in CHROME_USER_DATA_DIRS:
+        databases = []
+        for profile in _profile_dirs(Path(user_data_str).expanduser()):
+            # Chrome 96+ keeps cookies under Network/; older versions in the profile root
+            for relative in ("Network/Cookies", "Cookies"):
+                cookies_db = os.path.join(profile.path, relative)
+                if os.access(cookies_db, os.F_OK):
+                    databases.append((profile.name != "Default", cookies_db))
+        if databases:
+            yield [Path(cookies_db) for _, cookies_db in sorted(databases)]
+
+
+def _firefox_databases() -> Iterator[List[Path]]:
+    """Yield the cookie database of each default Firefox profile."""
+    for base_path_str in FIREFOX_PROFILE_ROOTS:
+        for profile in _profile_dirs(Path(base_path_str).expanduser()):
+            if ".default" not in profile.name:
+                continue
+            cookies_db = os.path.join(profile.path, "cookies.sqlite")
+            if os.access(cookies_db, os.F_OK):
+                yield [Path(cookies_db)]
+
+
+def extract_chrome_cookies(domain: str = "mybrightwheel.com") -> Dict[str, str]:
+    """
+    Extract cookies from Chrome's cookie databases, across all profiles.
+    
+    Args:
+        domain: Domain to extract cookies for
+        
+    Returns:
+        Dictionary of cookie name -> value pairs
+    """
+    cookies = {}
+    
+    for databases in _chrome_databases():
+        try:
+            cookies.update(_read_chrome_db(databases, domain))
+            logger.info(f"Extracted {len(cookies)} cookies from {len(databases)} Chrome profiles")
+            break
+            
+        except Exception as e:
+            logger.warning(f"Failed to read Chrome cookies: {e}")
+            continue
     
     return cookies
 
@@ -66,45 +323,51 @@ def extract_firefox_cookies(domain: str = "mybrightwheel.com") -> Dict[str, str]
     """
     cookies = {}
     
-    # Firefox profile directory
-    firefox_paths = [
-        "~/Library/Application Support/Firefox/Profiles",  # macOS
-        "~/.mozilla/firefox",  # Linux
-        "~/AppData/Roaming/Mozilla/Firefox/Profiles",  # Windows
-    ]
-    
-    for base_path_str in firefox_paths:
-        base_path = Path(base_path_str).expanduser()
-        if not base_path.exists():
-            continue
+    for databases in _firefox_databases():
+        try:
+            cookies.update(_read_firefox_db(databases, domain))
+            logger.info(f"Extracted {len(cookies)} cookies from Firefox")
+            break
             
-        # Find profile directories
-        for profile_path in base_path.glob("*.default*"):
-            cookies_db = profile_path / "cookies.sqlite"
-            if cookies_db.exists():
-                try:
-                    conn = sqlite3.connect(str(cookies_db))
-                    cursor = conn.cursor()
-                    
-                    cursor.execute(
-                        "SELECT name, value FROM moz_cookies WHERE host LIKE ?",
-                        (f"%{domain}",)
-                    )
-                    
-                    for name, value in cursor.fetchall():
-                        cookies[name] = value
-                        
-                    conn.close()
-                    logger.info(f"Extracted {len(cookies)} cookies from Firefox")
-                    break
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to read Firefox cookies: {e}")
-                    continue
+        except Exception as e:
+            logger.warning(f"Failed to read Firefox cookies: {e}")
+            continue
     
     return cookies
 
 
+def extract_specific_cookie(
+    name: str,
+    domain: str = "mybrightwheel.com",
+    session: Optional[BrowserCookieSession] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Find a single cookie, querying only its rows in each browser database.
+    
+    Args:
+        name: Cookie name
+        domain: Domain the cookie belongs to
+        session: Session to reuse database connections from
+        
+    Returns:
+        Tuple of (cookie value, browser name), or (None, None) if not found
+    """
+    browsers = (
+        ("Chrome", _chrome_databases, _read_chrome_db),
+        ("Firefox", _firefox_databases, _read_firefox_db),
+    )
+    for browser, sources, reader in browsers:
+        for databases in sources():
+            try:
+                value = reader(databases, domain, name, session).get(name)
+            except Exception as e:
+                logger.warning(f"Failed to read {browser} cookies: {e}")
+                continue
+            if value:
+                return value, browser
+    return None, None
+
+
 def get_brightwheel_v2_cookie() -> Optional[str]:
     """
     Attempt to extract the Brightwheel session cookie from browser.
@@ -112,17 +375,12 @@ def get_brightwheel_v2_cookie() -> Optional[str]:
     Returns:
         Session cookie value if found, None otherwise
     """
-    # Try Chrome first
-    chrome_cookies = extract_chrome_cookies()
-    if "_brightwheel_v2" in chrome_cookies:
-        logger.info("Found Brightwheel session cookie in Chrome")
-        return chrome_cookies["_brightwheel_v2"]
-    
-    # Try Firefox
-    firefox_cookies = extract_firefox_cookies()
-    if "_brightwheel_v2" in firefox_cookies:
-        logger.info("Found Brightwheel session cookie in Firefox")
-        return firefox_cookies["_brightwheel_v2"]
+    # Chrome first, then Firefox
+    with BrowserCookieSession() as session:
+        cookie, browser = extract_specific_cookie("_brightwheel_v2", session=session)
+    if cookie:
+        logger.info(f"Found Brightwheel session cookie in {browser}")
+        return cookie
     
     logger.warning("Could not find Brightwheel session cookie in browser")
     return None
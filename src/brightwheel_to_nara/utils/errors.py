@@ -1,33 +1,134 @@
 """Error handling and retry utilities."""
 import asyncio
 import functools
+import logging
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
 from typing import Type, Tuple, Optional, Callable, Any
 import httpx
 
 
+logger = logging.getLogger(__name__)
+
+
 class BrightwheelError(Exception):
     """Base exception for Brightwheel API errors."""
-    pass
+    
+    __slots__ = ()
 
 
 class AuthenticationError(BrightwheelError):
     """Authentication related errors."""
-    pass
+    
+    __slots__ = ()
 
 
 class RateLimitError(BrightwheelError):
     """Rate limit exceeded error."""
-    pass
+    
+    __slots__ = ()
 
 
 class NaraError(Exception):
     """Base exception for Nara API errors."""
-    pass
+    
+    __slots__ = ()
 
 
 class TransferError(Exception):
     """Error during data transfer between platforms."""
-    pass
+    
+    __slots__ = ()
+
+
+# Responses worth retrying: rate limiting and transient gateway/server failures
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether a failed request is worth retrying.
+    
+    Args:
+        error: The exception raised by the request
+        
+    Returns:
+        True for network failures and retryable HTTP statuses
+    """
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def is_unsent_request_error(error: Exception) -> bool:
+    """
+    Check whether a request failed before it could reach the server.
+    
+    Only these failures are safe to retry for requests that aren't
+    idempotent, since the server can't have acted on them.
+    
+    Args:
+        error: The exception raised by the request
+        
+    Returns:
+        True if no connection to the server was ever made
+    """
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Get the delay requested by a Retry-After response header.
+    
+    Args:
+        error: The exception raised by the request
+        
+    Returns:
+        Delay in seconds, or None if the server didn't ask for one
+    """
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    try:
+        return float(error.response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+# Statuses with a dedicated exception: status code -> (exception class, message)
+_STATUS_MAP: dict[int, Tuple[Type[BrightwheelError], str]] = {
+    401: (AuthenticationError, "Authentication failed. Please login again."),
+    429: (RateLimitError, "Rate limit exceeded. Please try again later."),
+}
+
+
+def _http_error(e: httpx.HTTPError) -> Optional[BrightwheelError]:
+    """
+    Build the BrightwheelError matching a failed request.
+    
+    Args:
+        e: The exception raised by httpx
+        
+    Returns:
+        The error to raise instead, or None to let the original propagate
+    """
+    if isinstance(e, httpx.HTTPStatusError):
+        status_code = e.response.status_code
+        mapped = _STATUS_MAP.get(status_code)
+        if mapped is not None:
+            error_class, message = mapped
+            return error_class(message)
+        if status_code >= 500:
+            return BrightwheelError(f"Server error: {status_code}")
+        return BrightwheelError(f"HTTP error: {status_code} - {e.response.text}")
+    if isinstance(e, httpx.TimeoutException):
+        return BrightwheelError("Request timed out. Please try again.")
+    if isinstance(e, httpx.NetworkError):
+        return BrightwheelError("Network error. Please check your connection.")
+    return None
 
 
 def handle_http_errors(func: Callable) -> Callable:
@@ -44,39 +145,59 @@ def handle_http_errors(func: Callable) -> Callable:
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                raise AuthenticationError("Authentication failed. Please login again.")
-            elif e.response.status_code == 429:
-                raise RateLimitError("Rate limit exceeded. Please try again later.")
-            elif e.response.status_code >= 500:
-                raise BrightwheelError(f"Server error: {e.response.status_code}")
-            else:
-                raise BrightwheelError(f"HTTP error: {e.response.status_code} - {e.response.text}")
-        except httpx.TimeoutException:
-            raise BrightwheelError("Request timed out. Please try again.")
-        except httpx.NetworkError:
-            raise BrightwheelError("Network error. Please check your connection.")
+        except httpx.HTTPError as e:
+            error = _http_error(e)
+            if error is None:
+                raise
+            raise error from e
     
     return wrapper
 
 
+# Upper bound on a single backoff delay, in seconds
+MAX_RETRY_DELAY = 30.0
+
+
+@functools.lru_cache(maxsize=32)
+def _backoff_schedule(max_retries: int, initial_delay: float, backoff_factor: float) -> Tuple[float, ...]:
+    """Delay before each retry, computed once per retry policy."""
+    return tuple(initial_delay * backoff_factor ** attempt for attempt in range(max_retries))
+
+
 async def retry_with_backoff(
     func: Callable,
+    *args: Any,
     max_retries: int = 3,
     initial_delay: float = 1.0,
     backoff_factor: float = 2.0,
-    exceptions: Tuple[Type[Exception], ...] = (Exception,)
+    exceptions: Tuple[Type[Exception], ...] = (Exception,),
+    should_retry: Optional[Callable[[Exception], bool]] = None,
+    jitter: bool = True,
+    max_delay: float = MAX_RETRY_DELAY,
+    max_total_seconds: Optional[float] = None,
+    **kwargs: Any
 ) -> Any:
     """
     Retry a function with exponential backoff.
     
+    A Retry-After header on a failed response extends the delay before the
+    next attempt. With jitter, each delay is scaled by a random factor
+    between 0.5 and 1.5 so concurrent callers don't retry in lockstep.
+    Backoff delays are capped at max_delay, and with max_total_seconds the
+    last error is raised as soon as the next wait would run past that budget.
+    
     Args:
-        func: Async function to retry
+        func: Async function to retry, called as func(*args, **kwargs)
+        *args: Positional arguments for func
         max_retries: Maximum number of retries
         initial_delay: Initial delay in seconds
         backoff_factor: Factor to multiply delay by for each retry
         exceptions: Tuple of exceptions to catch and retry
+        should_retry: Optional check deciding whether a caught exception is retried
+        jitter: Randomize each delay around its scheduled value
+        max_delay: Longest backoff delay in seconds; Retry-After may still exceed it
+        max_total_seconds: Time budget for all attempts and waits, or None for no limit
+        **kwargs: Keyword arguments for func
         
     Returns:
         Result of the function
@@ -84,31 +205,107 @@ async def retry_with_backoff(
     Raises:
         Last exception if all retries fail
     """
-    delay = initial_delay
     last_exception: Optional[Exception] = None
+    deadline = time.monotonic() + max_total_seconds if max_total_seconds else None
     
     for attempt in range(max_retries + 1):
         try:
-            return await func()
+            return await func(*args, **kwargs)
         except exceptions as e:
+            if should_retry and not should_retry(e):
+                raise
             last_exception = e
             if attempt < max_retries:
-                print(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
-                await asyncio.sleep(delay)
-                delay *= backoff_factor
+                delay = _backoff_schedule(max_retries, initial_delay, backoff_factor)[attempt]
+                if jitter:
+                    delay *= 0.5 + random.random()
+                wait = max(min(delay, max_delay), get_retry_after(e) or 0)
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    logger.warning("Attempt %d failed: %s. Retry budget exhausted.", attempt + 1, e)
+                    raise
+                logger.warning("Attempt %d failed: %s. Retrying in %.2fs...", attempt + 1, e, wait)
+                await asyncio.sleep(wait)
             else:
-                print(f"All {max_retries + 1} attempts failed.")
+                logger.warning("All %d attempts failed.", max_retries + 1)
     
     if last_exception:
         raise last_exception
 
 
+def _retry_client_method(should_retry: Callable[[Exception], bool]) -> Callable[[Callable], Callable]:
+    """Build a decorator retrying a client method on errors accepted by should_retry."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            return await retry_with_backoff(
+                func,
+                self,
+                *args,
+                max_retries=self.max_retries,
+                initial_delay=self.retry_delay,
+                should_retry=should_retry,
+                **kwargs
+            )
+        
+        return wrapper
+    
+    return decorator
+
+
+def retry_transient_errors(func: Callable) -> Callable:
+    """
+    Decorator to retry an API client method on transient failures.
+    
+    The client instance provides the retry policy through its
+    ``max_retries`` and ``retry_delay`` attributes.
+    
+    Args:
+        func: Async client method to wrap
+        
+    Returns:
+        Wrapped method with retries
+    """
+    return _retry_client_method(is_transient_error)(func)
+
+
+def retry_unsent_requests(func: Callable) -> Callable:
+    """
+    Decorator to retry a non-idempotent API client method.
+    
+    Only failures where the request never reached the server are retried;
+    after a timeout or gateway error the server may already have acted on it.
+    The retry policy comes from the client instance, as with
+    retry_transient_errors.
+    
+    Args:
+        func: Async client method to wrap
+        
+    Returns:
+        Wrapped method with retries
+    """
+    return _retry_client_method(is_unsent_request_error)(func)
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorEntry:
+    """A single failed activity transfer, without the exception or its traceback."""
+    activity_id: str
+    activity_type: str
+    error: str
+    error_type: str
+    context: Optional[dict] = None
+
+
 class ErrorLogger:
     """Log errors during transfer process."""
     
+    __slots__ = ("_errors", "_summary")
+    
     def __init__(self):
         """Initialize error logger."""
-        self.errors: list[dict] = []
+        self._errors: list[ErrorEntry] = []
+        # Error type name -> count, kept up to date as errors are logged
+        self._summary: Counter[str] = Counter()
         
     def log_error(
         self, 
@@ -126,13 +323,28 @@ class ErrorLogger:
             error: The exception that occurred
             context: Additional context information
         """
-        self.errors.append({
-            'activity_id': activity_id,
-            'activity_type': activity_type,
-            'error': str(error),
-            'error_type': type(error).__name__,
-            'context': context or {}
-        })
+        error_type = type(error).__name__
+        self._errors.append(ErrorEntry(activity_id, activity_type, str(error), error_type, context))
+        self._summary[error_type] += 1
+        # The message is only formatted if a handler accepts the record
+        logger.error(
+            "Failed to transfer %s activity %s: %s", activity_type, activity_id, error,
+            extra={'activity_id': activity_id, 'activity_type': activity_type, 'error_type': error_type}
+        )
+        
+    @property
+    def errors(self) -> list[dict]:
+        """All logged errors, as dictionaries."""
+        return [
+            {
+                'activity_id': entry.activity_id,
+                'activity_type': entry.activity_type,
+                'error': entry.error,
+                'error_type': entry.error_type,
+                'context': entry.context or {}
+            }
+            for entry in self._errors
+        ]
         
     def get_errors(self) -> list[dict]:
         """Get all logged errors."""
@@ -140,18 +352,13 @@ class ErrorLogger:
     
     def clear_errors(self):
         """Clear all logged errors."""
-        self.errors.clear()
+        self._errors.clear()
+        self._summary.clear()
         
     def has_errors(self) -> bool:
         """Check if any errors have been logged."""
-        return len(self.errors) > 0
+        return bool(self._errors)
     
     def get_error_summary(self) -> dict:
-        """Get a summary of errors by type."""
-        summary = {}
-        for error in self.errors:
-            error_type = error['error_type']
-            if error_type not in summary:
-                summary[error_type] = 0
-            summary[error_type] += 1
-        return summary
\ No newline at end of file
+        """Get a summary of errors by type, most frequent first."""
+        return dict(self._summary.most_common())
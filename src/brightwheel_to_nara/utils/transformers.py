@@ -1,94 +1,114 @@
 """Data transformation utilities between Brightwheel and Nara formats."""
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Optional, List, Tuple, Type, Union
 
 from ..models.brightwheel import (
-    ActivityType, DiaperActivity, BottleActivity, 
-    FoodActivity, NapActivity, MoodActivity,
-    TemperatureActivity, PhotoActivity, PottyActivity,
-    DiaperType
+    ActivityType, DiaperType, ActivityData
 )
 from ..models.nara import (
-    NaraActivityType, DiaperRecord, FeedingRecord,
+    NaraActivityType, NaraBaseActivity, DiaperRecord, FeedingRecord,
     SleepRecord, HealthRecord, PhotoRecord,
     DiaperStatus, FeedingType, SleepType
 )
 
 
-def transform_diaper_activity(brightwheel_activity: Dict[str, Any]) -> DiaperRecord:
+# ISO 8601 timestamp parser; C-implemented and accepts a trailing Z since Python 3.11
+_parse_dt = datetime.fromisoformat
+
+# Milliliters per US fluid ounce
+_OZ_TO_ML = 29.5735
+
+# Map Brightwheel diaper types to Nara
+_DIAPER_MAP = MappingProxyType({
+    DiaperType.WET: DiaperStatus.WET,
+    DiaperType.BM: DiaperStatus.DIRTY,
+    DiaperType.WET_BM: DiaperStatus.BOTH,
+    DiaperType.DRY: DiaperStatus.DRY
+})
+
+# Map bottle types to Nara feeding types; anything else is a plain bottle
+_BOTTLE_FEEDING_TYPES = MappingProxyType({
+    'formula': FeedingType.FORMULA,
+    'pumped': FeedingType.PUMPED
+})
+
+def _record_builder(record_class: Type[NaraBaseActivity]) -> Callable[..., Dict[str, Any]]:
     """
-    Transform Brightwheel diaper activity to Nara format.
+    Make a function that builds a record's fields as model_dump would return them.
     
     Args:
-        brightwheel_activity: Brightwheel diaper activity data
+        record_class: Nara record model
         
     Returns:
-        Nara DiaperRecord
+        Function taking field values as keyword arguments; fields not given get
+        their defaults, and default factories run per record so lists aren't shared
     """
-    # Map Brightwheel diaper types to Nara
-    diaper_map = {
-        DiaperType.WET: DiaperStatus.WET,
-        DiaperType.BM: DiaperStatus.DIRTY,
-        DiaperType.WET_BM: DiaperStatus.BOTH,
-        DiaperType.DRY: DiaperStatus.DRY
-    }
-    
+    defaults: Dict[str, Any] = {}
+    factories: List[Tuple[str, Callable[[], Any]]] = []
+    for name, field in record_class.model_fields.items():
+        if field.default_factory is not None:
+            factories.append((name, field.default_factory))
+        elif not field.is_required():
+            defaults[name] = field.default
+            
+    def build(**values: Any) -> Dict[str, Any]:
+        record = defaults.copy()
+        for name, factory in factories:
+            record[name] = factory()
+        record.update(values)
+        return record
+        
+    return build
+
+
+_diaper_record = _record_builder(DiaperRecord)
+_feeding_record = _record_builder(FeedingRecord)
+_sleep_record = _record_builder(SleepRecord)
+_health_record = _record_builder(HealthRecord)
+_photo_record = _record_builder(PhotoRecord)
+
+# Each activity is transformed straight into the dict sent to Nara. The typed
+# transformers below wrap the same fields with model_construct: every field is
+# set from values that already have the right type, so validation would only repeat work
+
+
+def _diaper_fields(brightwheel_activity: ActivityData) -> Dict[str, Any]:
+    """Nara diaper record fields for a Brightwheel diaper activity."""
     diaper_type = brightwheel_activity.get('diaper_type', 'wet')
-    nara_status = diaper_map.get(diaper_type, DiaperStatus.WET)
+    nara_status = _DIAPER_MAP.get(diaper_type, DiaperStatus.WET)
     
-    return DiaperRecord(
+    return _diaper_record(
         baby_id="",  # Will be set by caller
-        timestamp=datetime.fromisoformat(brightwheel_activity['timestamp']),
+        timestamp=_parse_dt(brightwheel_activity['timestamp']),
         status=nara_status,
         cream_applied=brightwheel_activity.get('has_cream', False),
         notes=brightwheel_activity.get('notes')
     )
 
 
-def transform_bottle_activity(brightwheel_activity: Dict[str, Any]) -> FeedingRecord:
-    """
-    Transform Brightwheel bottle activity to Nara feeding record.
-    
-    Args:
-        brightwheel_activity: Brightwheel bottle activity data
-        
-    Returns:
-        Nara FeedingRecord
-    """
+def _bottle_fields(brightwheel_activity: ActivityData) -> Dict[str, Any]:
+    """Nara feeding record fields for a Brightwheel bottle activity."""
     bottle_type = brightwheel_activity.get('bottle_type', 'milk')
+    feeding_type = _BOTTLE_FEEDING_TYPES.get(bottle_type, FeedingType.BOTTLE)
     
-    # Map bottle types to Nara feeding types
-    feeding_type = FeedingType.BOTTLE
-    if bottle_type == 'formula':
-        feeding_type = FeedingType.FORMULA
-    elif bottle_type == 'pumped':
-        feeding_type = FeedingType.PUMPED
-        
     amount_oz = brightwheel_activity.get('amount_oz', 0)
-    amount_ml = amount_oz * 29.5735  # Convert oz to ml
+    amount_ml = amount_oz * _OZ_TO_ML
     
-    return FeedingRecord(
+    return _feeding_record(
         baby_id="",  # Will be set by caller
-        timestamp=datetime.fromisoformat(brightwheel_activity['timestamp']),
+        timestamp=_parse_dt(brightwheel_activity['timestamp']),
         feeding_type=feeding_type,
         amount_ml=amount_ml,
         notes=brightwheel_activity.get('notes')
     )
 
 
-def transform_food_activity(brightwheel_activity: Dict[str, Any]) -> FeedingRecord:
-    """
-    Transform Brightwheel food activity to Nara feeding record.
-    
-    Args:
-        brightwheel_activity: Brightwheel food activity data
-        
-    Returns:
-        Nara FeedingRecord
-    """
-    return FeedingRecord(
+def _food_fields(brightwheel_activity: ActivityData) -> Dict[str, Any]:
+    """Nara feeding record fields for a Brightwheel food activity."""
+    return _feeding_record(
         baby_id="",  # Will be set by caller
-        timestamp=datetime.fromisoformat(brightwheel_activity['timestamp']),
+        timestamp=_parse_dt(brightwheel_activity['timestamp']),
         feeding_type=FeedingType.SOLID,
         food_items=brightwheel_activity.get('foods', []),
         notes=f"{brightwheel_activity.get('meal_type', 'meal')}: "
@@ -97,27 +117,19 @@ def transform_food_activity(brightwheel_activity: Dict[str, Any]) -> FeedingReco
     )
 
 
-def transform_nap_activity(brightwheel_activity: Dict[str, Any]) -> SleepRecord:
-    """
-    Transform Brightwheel nap activity to Nara sleep record.
-    
-    Args:
-        brightwheel_activity: Brightwheel nap activity data
-        
-    Returns:
-        Nara SleepRecord
-    """
-    start_time = datetime.fromisoformat(brightwheel_activity['start_time'])
+def _nap_fields(brightwheel_activity: ActivityData) -> Dict[str, Any]:
+    """Nara sleep record fields for a Brightwheel nap activity."""
+    start_time = _parse_dt(brightwheel_activity['start_time'])
     end_time = None
     duration_minutes = None
     
     if brightwheel_activity.get('end_time'):
-        end_time = datetime.fromisoformat(brightwheel_activity['end_time'])
+        end_time = _parse_dt(brightwheel_activity['end_time'])
         duration_minutes = int((end_time - start_time).total_seconds() / 60)
     elif brightwheel_activity.get('duration_minutes'):
         duration_minutes = brightwheel_activity['duration_minutes']
         
-    return SleepRecord(
+    return _sleep_record(
         baby_id="",  # Will be set by caller
         timestamp=start_time,
         sleep_type=SleepType.NAP,
@@ -128,7 +140,85 @@ def transform_nap_activity(brightwheel_activity: Dict[str, Any]) -> SleepRecord:
     )
 
 
-def transform_temperature_activity(brightwheel_activity: Dict[str, Any]) -> HealthRecord:
+def _temperature_fields(brightwheel_activity: ActivityData) -> Dict[str, Any]:
+    """Nara health record fields for a Brightwheel temperature activity."""
+    temp_f = brightwheel_activity.get('temperature_f', 98.6)
+    temp_c = (temp_f - 32) * 5 / 9  # Convert F to C
+    
+    return _health_record(
+        baby_id="",  # Will be set by caller
+        timestamp=_parse_dt(brightwheel_activity['timestamp']),
+        temperature_celsius=temp_c,
+        notes=f"Temperature taken via {brightwheel_activity.get('method', 'forehead')}. "
+               f"{brightwheel_activity.get('notes', '')}"
+    )
+
+
+def _photo_fields(brightwheel_activity: ActivityData) -> Dict[str, Any]:
+    """Nara photo record fields for a Brightwheel photo activity."""
+    photo_url = next(iter(brightwheel_activity.get('photo_urls') or ()), "")
+    
+    return _photo_record(
+        baby_id="",  # Will be set by caller
+        timestamp=_parse_dt(brightwheel_activity['timestamp']),
+        photo_url=photo_url,
+        caption=brightwheel_activity.get('caption') or brightwheel_activity.get('notes')
+    )
+
+
+def transform_diaper_activity(brightwheel_activity: ActivityData) -> DiaperRecord:
+    """
+    Transform Brightwheel diaper activity to Nara format.
+    
+    Args:
+        brightwheel_activity: Brightwheel diaper activity data
+        
+    Returns:
+        Nara DiaperRecord
+    """
+    return DiaperRecord.model_construct(**_diaper_fields(brightwheel_activity))
+
+
+def transform_bottle_activity(brightwheel_activity: ActivityData) -> FeedingRecord:
+    """
+    Transform Brightwheel bottle activity to Nara feeding record.
+    
+    Args:
+        brightwheel_activity: Brightwheel bottle activity data
+        
+    Returns:
+        Nara FeedingRecord
+    """
+    return FeedingRecord.model_construct(**_bottle_fields(brightwheel_activity))
+
+
+def transform_food_activity(brightwheel_activity: ActivityData) -> FeedingRecord:
+    """
+    Transform Brightwheel food activity to Nara feeding record.
+    
+    Args:
+        brightwheel_activity: Brightwheel food activity data
+        
+    Returns:
+        Nara FeedingRecord
+    """
+    return FeedingRecord.model_construct(**_food_fields(brightwheel_activity))
+
+
+def transform_nap_activity(brightwheel_activity: ActivityData) -> SleepRecord:
+    """
+    Transform Brightwheel nap activity to Nara sleep record.
+    
+    Args:
+        brightwheel_activity: Brightwheel nap activity data
+        
+    Returns:
+        Nara SleepRecord
+    """
+    return SleepRecord.model_construct(**_nap_fields(brightwheel_activity))
+
+
+def transform_temperature_activity(brightwheel_activity: ActivityData) -> HealthRecord:
     """
     Transform Brightwheel temperature activity to Nara health record.
     
@@ -138,19 +228,10 @@ def transform_temperature_activity(brightwheel_activity: Dict[str, Any]) -> Heal
     Returns:
         Nara HealthRecord
     """
-    temp_f = brightwheel_activity.get('temperature_f', 98.6)
-    temp_c = (temp_f - 32) * 5 / 9  # Convert F to C
-    
-    return HealthRecord(
-        baby_id="",  # Will be set by caller
-        timestamp=datetime.fromisoformat(brightwheel_activity['timestamp']),
-        temperature_celsius=temp_c,
-        notes=f"Temperature taken via {brightwheel_activity.get('method', 'forehead')}. "
-               f"{brightwheel_activity.get('notes', '')}"
-    )
+    return HealthRecord.model_construct(**_temperature_fields(brightwheel_activity))
 
 
-def transform_photo_activity(brightwheel_activity: Dict[str, Any]) -> PhotoRecord:
+def transform_photo_activity(brightwheel_activity: ActivityData) -> PhotoRecord:
     """
     Transform Brightwheel photo activity to Nara photo record.
     
@@ -160,18 +241,22 @@ def transform_photo_activity(brightwheel_activity: Dict[str, Any]) -> PhotoRecor
     Returns:
         Nara PhotoRecord
     """
-    photo_urls = brightwheel_activity.get('photo_urls', [])
-    photo_url = photo_urls[0] if photo_urls else ""
-    
-    return PhotoRecord(
-        baby_id="",  # Will be set by caller
-        timestamp=datetime.fromisoformat(brightwheel_activity['timestamp']),
-        photo_url=photo_url,
-        caption=brightwheel_activity.get('caption') or brightwheel_activity.get('notes')
-    )
+    return PhotoRecord.model_construct(**_photo_fields(brightwheel_activity))
 
 
-def transform_activity(brightwheel_activity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+# Built once at import; keyed by ActivityType, which also matches the raw type strings.
+# A match statement would compare the cases one by one, so later types would get slower.
+_DISPATCH: Dict[ActivityType, Tuple[NaraActivityType, Callable[[ActivityData], Dict[str, Any]]]] = {
+    ActivityType.DIAPER: (NaraActivityType.DIAPER, _diaper_fields),
+    ActivityType.BOTTLE: (NaraActivityType.FEEDING, _bottle_fields),
+    ActivityType.FOOD: (NaraActivityType.FEEDING, _food_fields),
+    ActivityType.NAP: (NaraActivityType.SLEEP, _nap_fields),
+    ActivityType.TEMPERATURE: (NaraActivityType.HEALTH, _temperature_fields),
+    ActivityType.PHOTO: (NaraActivityType.PHOTO, _photo_fields)
+}
+
+
+def transform_activity(brightwheel_activity: ActivityData) -> Optional[Dict[str, Any]]:
     """
     Transform a Brightwheel activity to Nara format.
     
@@ -181,23 +266,51 @@ def transform_activity(brightwheel_activity: Dict[str, Any]) -> Optional[Dict[st
     Returns:
         Nara activity record or None if not supported
     """
-    activity_type = brightwheel_activity.get('activity_type')
+    entry = _DISPATCH.get(brightwheel_activity.get('activity_type'))
+    if entry is None:
+        return None
+        
+    nara_type, transformer = entry
+    nara_activity = transformer(brightwheel_activity)
+    nara_activity['activity_type'] = nara_type.value
+    return nara_activity
+
+
+def transform_activities(
+    brightwheel_activities: List[ActivityData]
+) -> List[Union[Dict[str, Any], None, Exception]]:
+    """
+    Transform a batch of Brightwheel activities to Nara format.
     
-    transformers = {
-        ActivityType.DIAPER: transform_diaper_activity,
-        ActivityType.BOTTLE: transform_bottle_activity,
-        ActivityType.FOOD: transform_food_activity,
-        ActivityType.NAP: transform_nap_activity,
-        ActivityType.TEMPERATURE: transform_temperature_activity,
-        ActivityType.PHOTO: transform_photo_activity
-    }
+    A failing activity doesn't stop the batch; its exception is returned in
+    its place so the caller can report it.
     
-    transformer = transformers.get(activity_type)
-    if transformer:
-        nara_activity = transformer(brightwheel_activity)
-        return nara_activity.model_dump()
+    Args:
+        brightwheel_activities: Brightwheel activity data
+        
+    Returns:
+        For each activity, in order: the Nara activity record, None if the
+        type is not supported, or the exception raised while transforming it
+    """
+    dispatch = _DISPATCH.get
+    results: List[Union[Dict[str, Any], None, Exception]] = []
+    append = results.append
     
-    return None
+    for brightwheel_activity in brightwheel_activities:
+        entry = dispatch(brightwheel_activity.get('activity_type'))
+        if entry is None:
+            append(None)
+            continue
+        nara_type, transformer = entry
+        try:
+            nara_activity = transformer(brightwheel_activity)
+        except Exception as e:
+            append(e)
+            continue
+        nara_activity['activity_type'] = nara_type.value
+        append(nara_activity)
+        
+    return results
 
 
 def celsius_to_fahrenheit(celsius: float) -> float:
@@ -212,9 +325,9 @@ def fahrenheit_to_celsius(fahrenheit: float) -> float:
 
 def oz_to_ml(oz: float) -> float:
     """Convert ounces to milliliters."""
-    return oz * 29.5735
+    return oz * _OZ_TO_ML
 
 
 def ml_to_oz(ml: float) -> float:
     """Convert milliliters to ounces."""
-    return ml / 29.5735
\ No newline at end of file
+    return ml / _OZ_TO_ML
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""Tests for the Brightwheel API client."""
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+from brightwheel_to_nara.api.brightwheel_client import ACTIVITY_WINDOW_DAYS, BrightwheelClient
+from brightwheel_to_nara.models.brightwheel import DiaperActivity
+
+
+SIGN_IN_PAGE = '<meta name="csrf-token" content="token-123">'
+
+
+def make_client(handler) -> BrightwheelClient:
+    """Build a client whose requests are answered by handler."""
+    http_client = httpx.AsyncClient(
+        base_url=BrightwheelClient.BASE_URL,
+        transport=httpx.MockTransport(handler)
+    )
+    return BrightwheelClient(http_client=http_client)
+
+
+def sessions_handler(status_code: int, **response_kwargs):
+    """Serve the sign-in page and answer the sessions POST with a fixed response."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sign-in":
+            return httpx.Response(200, text=SIGN_IN_PAGE)
+        return httpx.Response(status_code, **response_kwargs)
+    return handler
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 403, 404, 422, 429, 500, 503])
+def test_http_login_falls_back_on_unexpected_status(status_code):
+    client = make_client(sessions_handler(status_code, text="nope"))
+
+    assert asyncio.run(client._login_with_http("user@example.com", "secret")) is None
+
+
+def test_http_login_falls_back_without_session_cookie():
+    client = make_client(sessions_handler(200, json={"id": "user-1"}))
+
+    assert asyncio.run(client._login_with_http("user@example.com", "secret")) is None
+
+
+def test_http_login_falls_back_on_non_json_response():
+    client = make_client(sessions_handler(
+        200, text="<html></html>", headers={"Set-Cookie": "_brightwheel_v2=cookie; Path=/"}
+    ))
+
+    assert asyncio.run(client._login_with_http("user@example.com", "secret")) is None
+
+
+def test_http_login_starts_session():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/sign-in":
+            return httpx.Response(200, text=SIGN_IN_PAGE)
+        return httpx.Response(
+            200, json={"id": "user-1"}, headers={"Set-Cookie": "_brightwheel_v2=cookie; Path=/"}
+        )
+
+    client = make_client(handler)
+    session = asyncio.run(client._login_with_http("user@example.com", "secret"))
+
+    assert session is not None
+    assert session.token == "cookie"
+    assert session.user_id == "user-1"
+    assert requests[-1].headers["X-CSRF-Token"] == "token-123"
+
+
+def test_login_uses_browser_when_http_login_fails(monkeypatch):
+    client = make_client(sessions_handler(404))
+    calls = []
+
+    async def fake_browser_login(username, password):
+        calls.append((username, password))
+        return "browser-session"
+
+    monkeypatch.setattr(client, "_login_with_browser", fake_browser_login)
+
+    assert asyncio.run(client.login("user@example.com", "secret")) == "browser-session"
+    assert calls == [("user@example.com", "secret")]
+
+
+def test_login_uses_browser_on_transport_error(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("unreachable", request=request)
+
+    client = make_client(handler)
+
+    async def fake_browser_login(username, password):
+        return "browser-session"
+
+    monkeypatch.setattr(client, "_login_with_browser", fake_browser_login)
+
+    assert asyncio.run(client.login("user@example.com", "secret")) == "browser-session"
+
+
+def logged_in_client(handler) -> BrightwheelClient:
+    """Build a client with an active session."""
+    client = make_client(handler)
+    client._start_session(token="cookie", cookies={"_brightwheel_v2": "cookie"}, user_id="user-1")
+    return client
+
+
+async def collect_windows(client, start_date, end_date, **kwargs):
+    """Gather every window yielded by iter_activity_windows."""
+    return [
+        window
+        async for window in client.iter_activity_windows("student-1", start_date, end_date, **kwargs)
+    ]
+
+
+def test_date_windows_short_range_is_one_window():
+    start, end = datetime(2024, 1, 1), datetime(2024, 1, 8)
+
+    assert BrightwheelClient._date_windows(start, end, ACTIVITY_WINDOW_DAYS) == [(start, end)]
+
+
+def test_date_windows_share_boundary_days():
+    windows = BrightwheelClient._date_windows(datetime(2024, 1, 1), datetime(2024, 3, 1), 28)
+
+    assert windows == [
+        (datetime(2024, 1, 1), datetime(2024, 1, 29)),
+        (datetime(2024, 1, 29), datetime(2024, 2, 26)),
+        (datetime(2024, 2, 26), datetime(2024, 3, 1)),
+    ]
+
+
+def test_default_sync_makes_one_request():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"activities": [{"id": "a1", "activity_type": "diaper"}]})
+
+    client = logged_in_client(handler)
+    windows = asyncio.run(collect_windows(client, datetime(2024, 1, 1), datetime(2024, 1, 8)))
+
+    assert windows == [[{"id": "a1", "activity_type": "diaper"}]]
+    assert len(requests) == 1
+    assert requests[0].url.params["start_date"] == "2024-01-01"
+    assert requests[0].url.params["end_date"] == "2024-01-08"
+
+
+def test_boundary_day_activities_are_yielded_once():
+    def handler(request: httpx.Request) -> httpx.Response:
+        # Every window returns the activity on the shared boundary day
+        start = request.url.params["start_date"]
+        return httpx.Response(200, json={"activities": [
+            {"id": "boundary", "activity_type": "diaper"},
+            {"id": f"{start}-own", "activity_type": "nap"},
+        ]})
+
+    client = logged_in_client(handler)
+    windows = asyncio.run(collect_windows(
+        client, datetime(2024, 1, 1), datetime(2024, 1, 21), window_days=10
+    ))
+
+    ids = [activity["id"] for window in windows for activity in window]
+    assert ids == ["boundary", "2024-01-01-own", "2024-01-11-own"]
+
+
+def feed_item(activity: dict) -> dict:
+    return {
+        "id": f"item-{activity['id']}",
+        "created_at": "2024-01-01T09:00:00Z",
+        "updated_at": "2024-01-01T09:00:00Z",
+        "activity": activity,
+    }
+
+
+def test_feed_keeps_unknown_activity_types():
+    diaper = {
+        "id": "a1", "activity_type": "diaper", "student_id": "student-1",
+        "timestamp": "2024-01-01T09:00:00Z", "diaper_type": "wet",
+    }
+    check_in = {"id": "a2", "activity_type": "check_in", "student_id": "student-1"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"items": [feed_item(diaper), feed_item(check_in)]})
+
+    client = logged_in_client(handler)
+    feed = asyncio.run(client.get_student_feed("student-1"))
+
+    assert isinstance(feed.items[0].activity, DiaperActivity)
+    # Types without a model come through as the raw activity instead of failing the page
+    assert feed.items[1].activity == check_in
+
+
+def test_stopping_early_settles_prefetched_windows():
+    async def run():
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"activities": []})
+
+        client = logged_in_client(handler)
+        windows = client.iter_activity_windows(
+            "student-1", datetime(2024, 1, 1), datetime(2024, 3, 1), window_days=10
+        )
+        await anext(windows)
+        await windows.aclose()
+        # Only the test's own task is left
+        return asyncio.all_tasks()
+
+    assert len(asyncio.run(run())) == 1
@@ -0,0 +1,67 @@
+"""Tests for the resume checkpoint and sent-activity stores."""
+from datetime import datetime, timezone
+
+import pytest
+
+from brightwheel_to_nara.utils.checkpoint import CheckpointStore, SentActivityStore, activity_digest
+
+
+def test_checkpoints_round_trip(tmp_path):
+    path = tmp_path / "checkpoints.json"
+    store = CheckpointStore(path)
+    store.set("student-1", datetime(2024, 1, 2, 10, tzinfo=timezone.utc))
+    store.save()
+
+    assert CheckpointStore(path).get("student-1") == datetime(2024, 1, 2, 10, tzinfo=timezone.utc)
+    assert CheckpointStore(path).get("student-2") is None
+
+
+def test_checkpoint_only_moves_forward(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoints.json")
+    store.set("student-1", datetime(2024, 1, 2, tzinfo=timezone.utc))
+    store.set("student-1", datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    assert store.get("student-1") == datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("content", [b"not json", b"[1, 2]", b'{"student-1": 5}', b'{"student-1": "soon"}'])
+def test_malformed_checkpoint_file_is_ignored(tmp_path, content):
+    path = tmp_path / "checkpoints.json"
+    path.write_bytes(content)
+
+    assert CheckpointStore(path).get("student-1") is None
+
+
+def test_sent_digests_persist_after_flush(tmp_path):
+    path = tmp_path / "sent.sqlite3"
+    store = SentActivityStore(path)
+    store.add([b"one", b"two"])
+
+    # Buffered digests count as sent before they are written
+    assert store.find_sent([b"one", b"three"]) == {b"one"}
+    store.flush()
+    store.close()
+
+    reopened = SentActivityStore(path)
+    assert reopened.find_sent([b"one", b"two", b"three"]) == {b"one", b"two"}
+    assert reopened.find_sent([]) == set()
+    reopened.close()
+
+
+def test_close_writes_buffered_digests(tmp_path):
+    path = tmp_path / "sent.sqlite3"
+    store = SentActivityStore(path)
+    store.add([b"one"])
+    store.close()
+
+    reopened = SentActivityStore(path)
+    assert reopened.find_sent([b"one"]) == {b"one"}
+    reopened.close()
+
+
+def test_activity_digest_ignores_key_order():
+    first = {"baby_id": "baby-1", "activity_type": "diaper", "status": "wet"}
+    second = {"status": "wet", "activity_type": "diaper", "baby_id": "baby-1"}
+
+    assert activity_digest(first) == activity_digest(second)
+    assert activity_digest(first) != activity_digest({**first, "status": "dirty"})
@@ -0,0 +1,173 @@
+"""Tests for the Nara API client."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from brightwheel_to_nara.api.nara_client import NaraClient
+from brightwheel_to_nara.models.nara import CreateActivityResponse
+from brightwheel_to_nara.utils import NaraError
+
+
+def make_client(handler) -> NaraClient:
+    """Build an authenticated client whose requests are answered by handler."""
+    http_client = httpx.AsyncClient(
+        base_url=NaraClient.BASE_URL,
+        transport=httpx.MockTransport(handler)
+    )
+    client = NaraClient(http_client=http_client, retry_delay=0)
+    client.access_token = "token"
+    return client
+
+
+def activities(count: int):
+    """Build generic activity payloads."""
+    return [{"activity_type": "note", "notes": f"note {index}"} for index in range(count)]
+
+
+class BatchEndpoint:
+    """Mock Nara API recording the requests it answers."""
+
+    def __init__(self, batch_status: int = 200):
+        self.batch_status = batch_status
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.path.endswith(":batchCreate"):
+            self.batch_calls += 1
+            if self.batch_status != 200:
+                return httpx.Response(self.batch_status)
+            return httpx.Response(200, json={"activities": [
+                {"id": f"b{index}", "success": True, "activity": activity}
+                for index, activity in enumerate(body["activities"])
+            ]})
+        self.single_calls += 1
+        return httpx.Response(200, json={"id": "s", "success": True, "activity": body})
+
+
+def test_batch_endpoint_creates_activities_in_one_request():
+    endpoint = BatchEndpoint()
+    client = make_client(endpoint)
+
+    results = asyncio.run(client.create_generic_activities_batch("baby-1", activities(3)))
+
+    assert [result.id for result in results] == ["b0", "b1", "b2"]
+    assert all(result.activity["baby_id"] == "baby-1" for result in results)
+    assert (endpoint.batch_calls, endpoint.single_calls) == (1, 0)
+
+
+@pytest.mark.parametrize("status_code", [404, 405, 501])
+def test_missing_batch_endpoint_falls_back_to_single_requests(status_code):
+    endpoint = BatchEndpoint(batch_status=status_code)
+    client = make_client(endpoint)
+
+    results = asyncio.run(client.create_generic_activities_batch("baby-1", activities(3)))
+
+    assert all(isinstance(result, CreateActivityResponse) for result in results)
+    assert (endpoint.batch_calls, endpoint.single_calls) == (1, 3)
+
+    # The client remembers the endpoint is missing and stops trying it
+    asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+    assert (endpoint.batch_calls, endpoint.single_calls) == (1, 5)
+
+
+def test_other_batch_errors_are_raised():
+    endpoint = BatchEndpoint(batch_status=400)
+    client = make_client(endpoint)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+    assert endpoint.single_calls == 0
+
+
+@pytest.mark.parametrize("result_count", [0, 1, 3])
+def test_batch_response_with_wrong_result_count_is_an_error(result_count):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"activities": [
+            {"id": str(index), "success": True, "activity": {}} for index in range(result_count)
+        ]})
+
+    client = make_client(handler)
+
+    with pytest.raises(NaraError):
+        asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+
+
+def test_rejected_batch_items_are_returned_as_errors():
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)["activities"]
+        return httpx.Response(200, json={"activities": [
+            {"id": str(index), "success": index == 0, "activity": activity}
+            for index, activity in enumerate(body)
+        ]})
+
+    client = make_client(handler)
+    results = asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+
+    assert isinstance(results[0], CreateActivityResponse)
+    assert isinstance(results[1], NaraError)
+
+
+def test_clients_sharing_a_pool_send_their_own_token():
+    authorizations = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        authorizations.append(request.headers.get("Authorization"))
+        return httpx.Response(200, json={"babies": []})
+
+    http_client = httpx.AsyncClient(base_url=NaraClient.BASE_URL, transport=httpx.MockTransport(handler))
+    first = NaraClient(http_client=http_client)
+    first.access_token = "first"
+    second = NaraClient(http_client=http_client)
+
+    asyncio.run(first.get_babies())
+    with pytest.raises(ValueError):
+        asyncio.run(second.get_babies())
+    second.access_token = "second"
+    asyncio.run(second.get_babies())
+
+    assert authorizations == ["Bearer first", "Bearer second"]
+    assert "Authorization" not in http_client.headers
+
+
+@pytest.mark.parametrize("error", [httpx.ReadTimeout("slow"), httpx.RemoteProtocolError("dropped")])
+def test_batch_is_not_resent_after_it_may_have_been_received(error):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise error
+
+    client = make_client(handler)
+
+    with pytest.raises(type(error)):
+        asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+    assert len(calls) == 1
+
+
+def test_batch_is_not_resent_after_gateway_timeout():
+    endpoint = BatchEndpoint(batch_status=504)
+    client = make_client(endpoint)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+    assert endpoint.batch_calls == 1
+
+
+def test_batch_is_retried_when_the_connection_failed():
+    endpoint = BatchEndpoint()
+    failures = [httpx.ConnectError("refused")]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if failures:
+            raise failures.pop()
+        return endpoint(request)
+
+    client = make_client(handler)
+    results = asyncio.run(client.create_generic_activities_batch("baby-1", activities(2)))
+
+    assert [result.id for result in results] == ["b0", "b1"]
+    assert endpoint.batch_calls == 1
@@ -0,0 +1,239 @@
+"""Tests for the transfer orchestration."""
+import asyncio
+import functools
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from brightwheel_to_nara import transfer as transfer_module
+from brightwheel_to_nara.api import BrightwheelClient, NaraClient
+from brightwheel_to_nara.config import get_settings
+from brightwheel_to_nara.models.brightwheel import Student
+from brightwheel_to_nara.models.nara import Baby
+from brightwheel_to_nara.transfer import CHECKPOINT_OVERLAP, DataTransfer, _fuzzy_match_baby
+from brightwheel_to_nara.utils import CheckpointStore, SentActivityStore
+
+
+NOW = datetime(2024, 3, 10, 18, tzinfo=timezone.utc)
+STUDENT = Student(id="student-1", first_name="Ada", last_name="L", birthdate=datetime(2023, 1, 1))
+
+
+class FakeApis:
+    """Mock Brightwheel and Nara APIs sharing one record of the requests made."""
+
+    def __init__(self):
+        self.activities = []
+        self.activity_requests = []
+        self.posted = []
+        self.nara_status = 200
+
+    def brightwheel(self, request: httpx.Request) -> httpx.Response:
+        self.activity_requests.append(request)
+        return httpx.Response(200, json={"activities": self.activities})
+
+    def nara(self, request: httpx.Request) -> httpx.Response:
+        if self.nara_status != 200:
+            return httpx.Response(self.nara_status)
+        body = json.loads(request.content)["activities"]
+        self.posted.extend(body)
+        return httpx.Response(200, json={"activities": [
+            {"id": str(index), "success": True, "activity": activity}
+            for index, activity in enumerate(body)
+        ]})
+
+
+@pytest.fixture
+def apis():
+    return FakeApis()
+
+
+@pytest.fixture
+def make_transfer(monkeypatch, tmp_path, apis):
+    """Build DataTransfer instances wired to the fake APIs, with stores under tmp_path."""
+    monkeypatch.setenv("BRIGHTWHEEL_USERNAME", "user")
+    monkeypatch.setenv("BRIGHTWHEEL_PASSWORD", "secret")
+    monkeypatch.setenv("RETRY_DELAY_SECONDS", "0")
+    monkeypatch.chdir(tmp_path)
+    get_settings.cache_clear()
+    monkeypatch.setattr(
+        transfer_module, "CheckpointStore",
+        functools.partial(CheckpointStore, tmp_path / "checkpoints.json")
+    )
+    monkeypatch.setattr(
+        transfer_module, "SentActivityStore",
+        functools.partial(SentActivityStore, tmp_path / "sent.sqlite3")
+    )
+
+    def make() -> DataTransfer:
+        data_transfer = DataTransfer()
+        data_transfer.brightwheel_client.http_client = httpx.AsyncClient(
+            base_url=BrightwheelClient.BASE_URL, transport=httpx.MockTransport(apis.brightwheel)
+        )
+        data_transfer.brightwheel_client._start_session(
+            token="cookie", cookies={"_brightwheel_v2": "cookie"}, user_id="user-1"
+        )
+        data_transfer.nara_client.http_client = httpx.AsyncClient(
+            base_url=NaraClient.BASE_URL, transport=httpx.MockTransport(apis.nara)
+        )
+        data_transfer.nara_client.access_token = "token"
+        return data_transfer
+
+    yield make
+    get_settings.cache_clear()
+
+
+def sync(data_transfer: DataTransfer, start_date: datetime = NOW - timedelta(days=7)):
+    """Run one student sync and persist its stores, as run() does."""
+    stats = asyncio.run(data_transfer.sync_student_activities(STUDENT, "baby-1", start_date, NOW))
+    data_transfer.checkpoints.save()
+    data_transfer.sent_activities.close()
+    return stats
+
+
+def diaper(activity_id: str, timestamp: str, diaper_type: str = "wet"):
+    return {"id": activity_id, "activity_type": "diaper", "timestamp": timestamp, "diaper_type": diaper_type}
+
+
+def test_checkpoint_is_latest_sent_activity(make_transfer, apis):
+    apis.activities = [
+        diaper("a1", "2024-03-09T10:00:00+00:00"),
+        # Unsupported types are never sent, so they don't move the checkpoint
+        {"id": "m1", "activity_type": "mood", "timestamp": "2024-03-09T12:00:00+00:00"},
+    ]
+    data_transfer = make_transfer()
+
+    stats = sync(data_transfer)
+
+    assert (stats['successful'], stats['skipped']) == (1, 1)
+    assert data_transfer.checkpoints.get("student-1") == datetime(2024, 3, 9, 10, tzinfo=timezone.utc)
+
+
+def test_failed_transfer_does_not_advance_checkpoint(make_transfer, apis):
+    apis.activities = [diaper("a1", "2024-03-09T10:00:00+00:00")]
+    apis.nara_status = 400
+    data_transfer = make_transfer()
+
+    stats = sync(data_transfer)
+
+    assert stats['failed'] == 1
+    assert data_transfer.checkpoints.get("student-1") is None
+
+
+def test_unconfirmed_batch_is_retried_next_run(make_transfer, apis):
+    apis.activities = [diaper("a1", "2024-03-09T10:00:00+00:00")]
+    data_transfer = make_transfer()
+    data_transfer.nara_client.http_client = httpx.AsyncClient(
+        base_url=NaraClient.BASE_URL,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"activities": []}))
+    )
+
+    stats = sync(data_transfer)
+    assert stats['failed'] == 1
+    assert data_transfer.checkpoints.get("student-1") is None
+
+    stats = sync(make_transfer())
+    assert stats['successful'] == 1
+    assert len(apis.posted) == 1
+
+
+def test_resume_refetches_overlap_before_checkpoint(make_transfer, apis):
+    apis.activities = [diaper("a1", "2024-03-09T10:00:00+00:00")]
+    sync(make_transfer())
+
+    # Activities entered late, or sharing the checkpoint time, are still picked up
+    apis.activities = [
+        diaper("a1", "2024-03-09T10:00:00+00:00"),
+        diaper("a0", "2024-03-08T09:00:00+00:00"),
+        diaper("a2", "2024-03-09T10:00:00+00:00", diaper_type="bm"),
+    ]
+    apis.activity_requests.clear()
+    stats = sync(make_transfer(), start_date=NOW - timedelta(days=30))
+
+    expected_start = (datetime(2024, 3, 9, 10) - CHECKPOINT_OVERLAP).date().isoformat()
+    assert apis.activity_requests[0].url.params["start_date"] == expected_start
+    assert (stats['successful'], stats['skipped']) == (2, 1)
+
+
+def test_force_full_ignores_checkpoint(make_transfer, apis, monkeypatch):
+    apis.activities = [diaper("a1", "2024-03-09T10:00:00+00:00")]
+    sync(make_transfer())
+
+    monkeypatch.setenv("FORCE_FULL", "true")
+    get_settings.cache_clear()
+    apis.activity_requests.clear()
+    start_date = NOW - timedelta(days=30)
+    sync(make_transfer(), start_date=start_date)
+
+    assert apis.activity_requests[0].url.params["start_date"] == start_date.date().isoformat()
+
+
+def test_rerun_skips_activities_already_sent(make_transfer, apis):
+    apis.activities = [diaper("a1", "2024-03-09T10:00:00+00:00"), diaper("a2", "2024-03-09T11:00:00+00:00")]
+    first = sync(make_transfer())
+    assert first['successful'] == 2
+
+    # The resume overlap fetches the same activities again
+    apis.posted.clear()
+    second = sync(make_transfer())
+    assert (second['successful'], second['skipped']) == (0, 2)
+    assert apis.posted == []
+
+
+def test_sent_activities_are_remembered_when_a_later_batch_fails(make_transfer, apis, monkeypatch):
+    monkeypatch.setenv("BATCH_SIZE", "1")
+    get_settings.cache_clear()
+    apis.activities = [diaper("a1", "2024-03-09T10:00:00+00:00"), diaper("a2", "2024-03-09T11:00:00+00:00")]
+    sent_once = []
+
+    def nara(request: httpx.Request) -> httpx.Response:
+        # Accept the first batch, reject every later one
+        if sent_once:
+            return httpx.Response(400)
+        sent_once.append(request)
+        return apis.nara(request)
+
+    data_transfer = make_transfer()
+    data_transfer.nara_client.http_client = httpx.AsyncClient(
+        base_url=NaraClient.BASE_URL, transport=httpx.MockTransport(nara)
+    )
+    stats = sync(data_transfer)
+    assert (stats['successful'], stats['failed']) == (1, 1)
+
+    apis.posted.clear()
+    stats = sync(make_transfer())
+    assert (stats['successful'], stats['skipped']) == (1, 1)
+    assert len(apis.posted) == 1
+
+
+def baby(baby_id: str, name: str, birth_date: datetime = datetime(2023, 1, 1)) -> Baby:
+    return Baby(id=baby_id, name=name, birth_date=birth_date)
+
+
+def student(student_id: str, first_name: str, birthdate: datetime = datetime(2023, 1, 1)) -> Student:
+    return Student(id=student_id, first_name=first_name, last_name="L", birthdate=birthdate)
+
+
+def test_fuzzy_match_accepts_prefix_and_close_spelling():
+    assert _fuzzy_match_baby("alex", [baby("b1", "Alexander L")]).id == "b1"
+    assert _fuzzy_match_baby("katherine", [baby("b1", "Katharine L")]).id == "b1"
+
+
+def test_fuzzy_match_rejects_distant_short_and_tied_names():
+    assert _fuzzy_match_baby("ada", [baby("b1", "Zed L")]) is None
+    # Two-letter names are too short to count as a prefix
+    assert _fuzzy_match_baby("al", [baby("b1", "Alice L")]) is None
+    assert _fuzzy_match_baby("sam", [baby("b1", "Samuel L"), baby("b2", "Samantha L")]) is None
+
+
+def test_map_students_prefers_exact_matches(make_transfer):
+    data_transfer = make_transfer()
+    students = [student("s1", "Alex"), student("s2", "Alexa"), student("s3", "Ada", datetime(2022, 5, 5))]
+    babies = [baby("b1", "Alexa L"), baby("b2", "Alexander L"), baby("b3", "Ada L")]
+
+    mapping = asyncio.run(data_transfer.map_students_to_babies(students, babies))
+
+    # Alexa claims its exact match first; Alex falls back to the remaining Alexander.
+    # Ada's birthdate differs from baby Ada's, so it stays unmapped.
+    assert mapping == {"s1": "b2", "s2": "b1"}